@@ -0,0 +1,364 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from issue_1 import CountVectorizer, CSRMatrix
+from issue_2 import tf_transform
+from issue_3 import idf_transform
+from issue_4 import TfidfTransformer
+from issue_5 import TfidfVectorizer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PUNCTUATION = ",.!?"
+DENSE_LIMIT = 20000
+
+STAGES = {
+    "CountVectorizer": lambda corpus, counts: CountVectorizer(
+        sparse=True
+    ).fit_transform(corpus),
+    "tf_transform": lambda corpus, counts: tf_transform(counts),
+    "idf_transform": lambda corpus, counts: idf_transform(counts),
+    "TfidfTransformer": lambda corpus, counts: TfidfTransformer().fit_transform(counts),
+    "TfidfVectorizer": lambda corpus, counts: TfidfVectorizer(
+        sparse=True
+    ).fit_transform(corpus),
+}
+
+TOKENIZER_CONFIGS = {
+    "split": {},
+    "regex": {"token_pattern": r"(?u)\b\w+\b"},
+    "regex+stop_words": {
+        "token_pattern": r"(?u)\b\w+\b",
+        "stop_words": {f"w{i}" for i in range(20)},
+    },
+    "regex+bigrams": {"token_pattern": r"(?u)\b\w+\b", "ngram_range": (1, 2)},
+}
+
+
+def make_corpus(
+    n_docs: int, doc_length: int = 50, vocabulary_size: int = 10000, seed: int = 0
+) -> List[str]:
+    """
+    Generate a synthetic corpus with a Zipfian vocabulary.
+
+    The probability of the k-th most frequent word is proportional to
+    1 / k, and some words carry trailing punctuation.
+
+    :param n_docs: Number of documents.
+    :param doc_length: Number of words in a document.
+    :param vocabulary_size: Number of distinct words.
+    :param seed: Seed of the random generator.
+    :return: A list of text documents.
+    """
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary_size)]
+    weights = [1 / rank for rank in range(1, vocabulary_size + 1)]
+    corpus = []
+    for _ in range(n_docs):
+        tokens = rng.choices(words, weights, k=doc_length)
+        tokens[-1] += rng.choice(PUNCTUATION)
+        corpus.append(" ".join(tokens))
+    return corpus
+
+
+def benchmark_tokenizer(corpus: List[str]) -> Dict[str, float]:
+    """
+    Measure CountVectorizer.fit throughput for every tokenizer setup.
+
+    :param corpus: A list of text documents.
+    :return: Documents per second for every setup.
+    """
+    results = {}
+    for name, config in TOKENIZER_CONFIGS.items():
+        vectorizer = CountVectorizer(**config)
+        start = time.perf_counter()
+        vectorizer.fit(corpus)
+        elapsed = time.perf_counter() - start
+        results[name] = len(corpus) / elapsed
+    return results
+
+
+def benchmark_tfidf(corpus: List[str]) -> Dict[str, float]:
+    """
+    Compare the fused TfidfVectorizer with the staged pipeline.
+
+    The staged pipeline builds a dense count matrix with CountVectorizer
+    and weights it with TfidfTransformer. Dense pipelines are skipped
+    above DENSE_LIMIT documents.
+
+    :param corpus: A list of text documents.
+    :return: Documents per second for every pipeline.
+    """
+    pipelines = {
+        "staged": lambda: TfidfTransformer().fit_transform(
+            CountVectorizer().fit_transform(corpus)
+        ),
+        "fused dense": lambda: TfidfVectorizer().fit_transform(corpus),
+        "fused sparse": lambda: TfidfVectorizer(sparse=True).fit_transform(corpus),
+    }
+    if len(corpus) > DENSE_LIMIT:
+        pipelines = {"fused sparse": pipelines["fused sparse"]}
+    results = {}
+    for name, run in pipelines.items():
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        results[name] = len(corpus) / elapsed
+    return results
+
+
+def benchmark_vocabulary(corpus: List[str]) -> Dict[str, float]:
+    """
+    Measure the memory kept by a fitted CountVectorizer.
+
+    The default dictionaries and list are compared with the compact
+    vocabulary, for single tokens and for bigrams.
+
+    :param corpus: A list of text documents.
+    :return: Megabytes allocated by the fitted vectorizer for every setup.
+    """
+    configs = {
+        "dict": {},
+        "compact": {"compact": True},
+        "dict bigrams": {"ngram_range": (1, 2)},
+        "compact bigrams": {"ngram_range": (1, 2), "compact": True},
+    }
+    results = {}
+    for name, config in configs.items():
+        gc.collect()
+        tracemalloc.start()
+        vectorizer = CountVectorizer(**config).fit(corpus)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = retained / 2**20
+        del vectorizer
+    return results
+
+
+def _peak_rss_mib() -> Optional[float]:
+    """
+    Get the peak resident set size of the current process.
+
+    :return: Megabytes, or None where the resource module is missing.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _measure(function: Callable[[], Any], trace: bool) -> Dict[str, float]:
+    """
+    Time a function and record its memory use.
+
+    The function is run once untraced for the wall time and, if
+    ``trace`` is set, once more under tracemalloc for the peak of
+    Python allocations.
+
+    :param function: The work to measure.
+    :param trace: Also measure the tracemalloc peak.
+    :return: Seconds, peak RSS and tracemalloc peak in megabytes.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    function()
+    metrics = {
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mib": _peak_rss_mib(),
+    }
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        metrics["tracemalloc_peak_mib"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return metrics
+
+
+def _measure_in_child(connection: Any, function: Callable[[], Any], trace: bool):
+    """
+    Send the measurements of a function from a child process.
+    """
+    connection.send(_measure(function, trace))
+    connection.close()
+
+
+def measure(function: Callable[[], Any], trace: bool = True) -> Dict[str, float]:
+    """
+    Measure a function in a forked child process where possible.
+
+    A fresh process per measurement makes the peak RSS belong to one
+    stage (plus the inputs it shares with the parent) instead of to the
+    whole benchmark run.
+
+    :param function: The work to measure.
+    :param trace: Also measure the tracemalloc peak.
+    :return: Seconds, peak RSS and tracemalloc peak in megabytes.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return _measure(function, trace)
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure_in_child, args=(sender, function, trace))
+    process.start()
+    metrics = receiver.recv()
+    process.join()
+    return metrics
+
+
+def benchmark_stages(
+    corpus: List[str], counts: CSRMatrix, trace: bool = True
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure every stage of the text-vectorization stack.
+
+    tf_transform, idf_transform and TfidfTransformer get the sparse count
+    matrix of the corpus, so they scale to corpora whose dense matrix
+    would not fit in memory.
+
+    :param corpus: A list of text documents.
+    :param counts: Sparse count matrix of the corpus.
+    :param trace: Also measure tracemalloc peaks.
+    :return: Seconds, documents per second and memory for every stage.
+    """
+    results = {}
+    for name, stage in STAGES.items():
+        metrics = measure(lambda: stage(corpus, counts), trace)
+        metrics["docs_per_sec"] = len(corpus) / metrics["seconds"]
+        results[name] = metrics
+    return results
+
+
+BENCHMARKS = {
+    "tokenizer": (benchmark_tokenizer, "docs/sec"),
+    "tfidf": (benchmark_tfidf, "docs/sec"),
+    "vocabulary": (benchmark_vocabulary, "MiB"),
+}
+
+
+def run(
+    benchmarks: List[str], scales: List[int], seed: int = 0, trace: bool = True
+) -> Dict[str, Any]:
+    """
+    Run benchmarks on synthetic corpora of several sizes.
+
+    :param benchmarks: Names of "stages" or entries of BENCHMARKS.
+    :param scales: Numbers of documents of the corpora.
+    :param seed: Seed of the corpus generator.
+    :param trace: Measure tracemalloc peaks of the stages.
+    :return: Machine-readable results with the environment they come from.
+    """
+    results = []
+    for n_docs in scales:
+        corpus = make_corpus(n_docs, seed=seed)
+        for benchmark in benchmarks:
+            if benchmark == "stages":
+                counts = CountVectorizer(sparse=True).fit_transform(corpus)
+                stages = benchmark_stages(corpus, counts, trace)
+                del counts
+                for name, metrics in stages.items():
+                    results.append(
+                        {"benchmark": benchmark, "name": name, "n_docs": n_docs}
+                        | metrics
+                    )
+                continue
+            function, unit = BENCHMARKS[benchmark]
+            for name, value in function(corpus).items():
+                results.append(
+                    {
+                        "benchmark": benchmark,
+                        "name": name,
+                        "n_docs": n_docs,
+                        "value": value,
+                        "unit": unit,
+                    }
+                )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    """
+    Print benchmark results as an aligned table.
+
+    :param report: The output of run.
+    """
+    for result in report["results"]:
+        label = f"{result['benchmark']:<10} {result['name']:<18} {result['n_docs']:>9}"
+        if "value" in result:
+            print(f"{label} {result['value']:>14,.1f} {result['unit']}")
+            continue
+        line = (
+            f"{label} {result['seconds']:>9.3f} s {result['docs_per_sec']:>12,.0f}"
+            " docs/sec"
+        )
+        if result["peak_rss_mib"] is not None:
+            line += f" {result['peak_rss_mib']:>9.1f} MiB RSS"
+        if "tracemalloc_peak_mib" in result:
+            line += f" {result['tracemalloc_peak_mib']:>9.1f} MiB traced"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run the benchmarks from the command line.
+
+    :param argv: Command line arguments, sys.argv by default.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the text-vectorization stack."
+    )
+    names = ["stages", *BENCHMARKS]
+    parser.add_argument(
+        "benchmarks", nargs="*", help=f"any of {', '.join(names)}, default stages"
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="numbers of documents, e.g. 1000 10000 100000 1000000",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-tracemalloc",
+        action="store_true",
+        help="skip the traced second run of every stage",
+    )
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(names)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = run(
+        args.benchmarks or ["stages"],
+        args.scales,
+        seed=args.seed,
+        trace=not args.no_tracemalloc,
+    )
+    print_results(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
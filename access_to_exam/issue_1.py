@@ -1,5 +1,306 @@
+import heapq
+import math
+import os
+import re
 import warnings
-from typing import Dict, List
+import zlib
+from array import array
+from collections import deque
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from vocabulary import CompactVocabulary, TokenCounts, TokenList
+
+SHARD_SIZE = 2048
+SHARDS_PER_JOB = 2
+
+
+class CSRMatrix:
+    """
+    Compressed sparse row (CSR) matrix.
+
+    Non-zero values of row ``i`` are stored in
+    ``data[indptr[i]:indptr[i + 1]]`` and their column numbers in
+    ``indices[indptr[i]:indptr[i + 1]]``, so memory is proportional
+    to the number of non-zero entries.
+    """
+
+    def __init__(
+        self,
+        indptr: Sequence[int],
+        indices: Sequence[int],
+        data: Sequence[Union[int, float]],
+        shape: Tuple[int, int],
+    ) -> None:
+        """
+        Initialize the CSRMatrix instance.
+
+        Args:
+            indptr: Row boundaries, ``len(indptr) == n_rows + 1``.
+            indices: Column number of every non-zero value.
+            data: Non-zero values.
+            shape: Number of rows and columns.
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @property
+    def nnz(self) -> int:
+        """
+        Number of stored (non-zero) values.
+        """
+        return len(self.data)
+
+    def toarray(self) -> List[List[Union[int, float]]]:
+        """
+        Convert the matrix to a dense list of lists.
+
+        Returns:
+            The dense matrix.
+        """
+        n_rows, n_cols = self.shape
+        zero = 0.0 if isinstance(self.data, array) and self.data.typecode == "d" else 0
+        output = []
+        for i in range(n_rows):
+            row = [zero] * n_cols
+            for j in range(self.indptr[i], self.indptr[i + 1]):
+                row[self.indices[j]] = self.data[j]
+            output.append(row)
+        return output
+
+
+class Analyzer:
+    """
+    Split a document into tokens and word n-grams.
+
+    The token pattern is compiled once, stop words are looked up in a
+    frozenset and n-grams are produced from a sliding window over the
+    token stream, so a document is processed in a single pass without
+    intermediate lists of n-grams. Instances are picklable and can be
+    sent to worker processes.
+    """
+
+    def __init__(
+        self,
+        lowercase: bool = True,
+        token_pattern: Optional[str] = None,
+        stop_words: Optional[Collection[str]] = None,
+        ngram_range: Tuple[int, int] = (1, 1),
+    ) -> None:
+        """
+        Initialize the Analyzer instance.
+
+        Args:
+            lowercase: Convert documents to lowercase before tokenizing.
+            token_pattern: Regular expression matching a token, e.g.
+                ``r"(?u)\\b\\w+\\b"`` to strip punctuation. By default
+                documents are split on whitespace.
+            stop_words: Tokens to drop before building n-grams.
+            ngram_range: Smallest and largest n of word n-grams to
+                produce, ``(1, 1)`` means single tokens only.
+        """
+        min_n, max_n = ngram_range
+        if not 1 <= min_n <= max_n:
+            raise ValueError("ngram_range must satisfy 1 <= min_n <= max_n.")
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.stop_words = frozenset(stop_words or ())
+        self.ngram_range = ngram_range
+        self._token_regex = re.compile(token_pattern) if token_pattern else None
+
+    def _tokens(self, text: str) -> Iterable[str]:
+        """
+        Split a document into tokens, without stop words.
+
+        Args:
+            text: A text document.
+
+        Returns:
+            The tokens of the document.
+        """
+        if self.lowercase:
+            text = text.lower()
+        if self._token_regex is None:
+            tokens = text.split()
+        else:
+            tokens = self._token_regex.findall(text)
+        if self.stop_words:
+            stop_words = self.stop_words
+            return [token for token in tokens if token not in stop_words]
+        return tokens
+
+    def _ngrams(self, tokens: Iterable[str]) -> Iterator[str]:
+        """
+        Produce word n-grams from a sliding window over tokens.
+
+        The n-grams ending at a token are built by appending it to the
+        shorter n-grams ending at the previous token, so every n-gram
+        costs a single string concatenation. N-grams are produced in
+        order of their last token, shortest first.
+
+        Args:
+            tokens: The tokens of a document.
+
+        Yields:
+            N-grams joined with a space.
+        """
+        min_n, max_n = self.ngram_range
+        shortest = min_n - 1
+        previous: List[str] = []
+        for token in tokens:
+            current = [token]
+            current.extend([gram + " " + token for gram in previous])
+            yield from current[shortest:]
+            previous = current[: max_n - 1]
+
+    def __call__(self, text: str) -> Iterable[str]:
+        """
+        Analyze a document.
+
+        Args:
+            text: A text document.
+
+        Returns:
+            The tokens and n-grams of the document.
+        """
+        tokens = self._tokens(text)
+        if self.ngram_range == (1, 1):
+            return tokens
+        return self._ngrams(tokens)
+
+
+def _count_tokens(text: str, analyzer: Analyzer) -> Dict[str, int]:
+    """
+    Tokenize a document and count its tokens.
+
+    Args:
+        text: A text document.
+        analyzer: The analyzer producing tokens.
+
+    Returns:
+        A dictionary of token counts in order of first occurrence.
+    """
+    counts: Dict[str, int] = {}
+    for token in analyzer(text):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def _iter_shards(corpus: Iterable[str], shard_size: int) -> Iterator[List[str]]:
+    """
+    Split a corpus into consecutive lists of documents.
+
+    Args:
+        corpus: An iterable of text documents.
+        shard_size: Maximum number of documents in a shard.
+
+    Yields:
+        Shards in corpus order.
+    """
+    iterator = iter(corpus)
+    shard = list(islice(iterator, shard_size))
+    while shard:
+        yield shard
+        shard = list(islice(iterator, shard_size))
+
+
+def _map_shards(
+    function: Callable[[List[str]], Any], corpus: Iterable[str], n_jobs: int
+) -> Iterator[Any]:
+    """
+    Apply a function to shards of a corpus, in worker processes if needed.
+
+    Results are returned in corpus order whatever the number of jobs.
+    At most SHARDS_PER_JOB shards per worker are read ahead, so memory
+    stays bounded when the corpus is streamed.
+
+    Args:
+        function: A picklable function of a list of documents.
+        corpus: An iterable of text documents.
+        n_jobs: Number of worker processes, -1 means all CPUs.
+
+    Yields:
+        The result of every shard.
+    """
+    shards = _iter_shards(corpus, SHARD_SIZE)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1:
+        yield from map(function, shards)
+        return
+    with Pool(n_jobs) as pool:
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.apply_async(function, (shard,)))
+            if len(pending) >= n_jobs * SHARDS_PER_JOB:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def _check_n_jobs(n_jobs: int) -> None:
+    """
+    Validate the number of worker processes.
+
+    Raises:
+        ValueError: If n_jobs is neither positive nor -1.
+    """
+    if n_jobs == 0 or n_jobs < -1:
+        raise ValueError("n_jobs must be a positive integer or -1.")
+
+
+def _count_shard(
+    documents: List[str],
+    analyzer: Analyzer,
+    keep_totals: bool = True,
+    keep_rows: bool = True,
+) -> Tuple[int, Dict[str, int], Dict[str, int], List[Dict[str, int]]]:
+    """
+    Count the tokens of a shard of documents.
+
+    This runs in worker processes, so it is a module-level function.
+
+    Args:
+        documents: Documents of the shard.
+        analyzer: The analyzer producing tokens.
+        keep_totals: Accumulate token counts over the whole shard.
+        keep_rows: Return token counts of every document.
+
+    Returns:
+        Number of documents, shard token counts in order of first
+        occurrence and numbers of
+        documents containing every token (both empty unless
+        ``keep_totals``), and per-document token counts (empty unless
+        ``keep_rows``).
+    """
+    totals: Dict[str, int] = {}
+    document_frequency: Dict[str, int] = {}
+    rows = []
+    for text in documents:
+        counts = _count_tokens(text, analyzer)
+        if keep_totals:
+            for token, count in counts.items():
+                totals[token] = totals.get(token, 0) + count
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        if keep_rows:
+            rows.append(counts)
+    return len(documents), totals, document_frequency, rows
 
 
 class CountVectorizer:
@@ -7,73 +308,643 @@ class CountVectorizer:
     Convert a collection of text documents to a matrix of token counts.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        sparse: bool = False,
+        n_jobs: int = 1,
+        min_df: Union[int, float] = 1,
+        max_df: Union[int, float] = 1.0,
+        max_features: Optional[int] = None,
+        lowercase: bool = True,
+        token_pattern: Optional[str] = None,
+        stop_words: Optional[Collection[str]] = None,
+        ngram_range: Tuple[int, int] = (1, 1),
+        compact: bool = False,
+    ) -> None:
         """
         Initialize the CountVectorizer instance.
 
-        Sets up empty lists for tokenized corpus, individual texts,
-        and feature names.
+        Args:
+            sparse: Return a CSRMatrix instead of a dense list of lists
+                from fit_transform.
+            n_jobs: Number of worker processes used for tokenizing and
+                counting, -1 means all CPUs. Results are identical to the
+                serial ones.
+            min_df: Drop tokens found in fewer documents than this. An
+                int is a number of documents, a float a share of them.
+            max_df: Drop tokens found in more documents than this. An
+                int is a number of documents, a float a share of them.
+            max_features: Keep only this many tokens with the highest
+                counts over the corpus.
+            lowercase: Convert documents to lowercase before tokenizing.
+            token_pattern: Regular expression matching a token; documents
+                are split on whitespace by default.
+            stop_words: Tokens to drop.
+            ngram_range: Smallest and largest n of word n-grams.
+            compact: Keep the vocabulary, token counts and document
+                frequencies in a CompactVocabulary (flat buffers and
+                arrays) instead of dictionaries and a list, which uses
+                several times less memory but looks tokens up slower.
+                Cannot be combined with min_df, max_df or max_features.
+        """
+        _check_n_jobs(n_jobs)
+        for name, value in (("min_df", min_df), ("max_df", max_df)):
+            if isinstance(value, float) and not 0.0 <= value <= 1.0:
+                raise ValueError(f"{name} as a float must be in [0.0, 1.0].")
+            if value < 0:
+                raise ValueError(f"{name} must not be negative.")
+        if max_features is not None and max_features < 0:
+            raise ValueError("max_features must not be negative.")
+        self.sparse = sparse
+        self.n_jobs = n_jobs
+        self.min_df = min_df
+        self.max_df = max_df
+        self.max_features = max_features
+        self.compact = compact
+        if compact and self._prunes():
+            raise ValueError(
+                "compact cannot be combined with min_df, max_df or max_features."
+            )
+        self.analyzer = Analyzer(lowercase, token_pattern, stop_words, ngram_range)
+        self._reset()
+
+    def _reset(self) -> None:
         """
-        self.tokenized_corpus = []
-        self.tokenized_text = []
+        Forget the learned vocabulary and token counts.
+        """
+        self.n_documents = 0
+        if self.compact:
+            vocabulary = CompactVocabulary()
+            self.vocabulary = vocabulary
+            self.feature_names = TokenList(vocabulary)
+            self.dict_counter = TokenCounts(vocabulary, vocabulary.counts)
+            self.document_frequency = TokenCounts(vocabulary, vocabulary.frequencies)
+            return
         self.feature_names = []
+        self.vocabulary: Dict[str, int] = {}
+        self.dict_counter: Dict[str, int] = {}
+        self.document_frequency: Dict[str, int] = {}
+
+    def _thaw(self) -> None:
+        """
+        Copy a vocabulary loaded by load_model into mutable structures.
+
+        Loaded models keep read-only views of the model file; they are
+        copied on the first update so the vectorizer can keep learning.
+        Counts of tokens pruned before saving are not in the file, so
+        such tokens start again from zero.
+        """
+        if isinstance(self.vocabulary, (dict, CompactVocabulary)):
+            return
+        tokens = list(self.feature_names)
+        counts = [self.dict_counter[token] for token in tokens]
+        frequencies = [self.document_frequency[token] for token in tokens]
+        n_documents = self.n_documents
+        self._reset()
+        self.n_documents = n_documents
+        if self.compact:
+            vocabulary = self.vocabulary
+            for token, count, frequency in zip(tokens, counts, frequencies):
+                column = vocabulary.add(token)
+                vocabulary.counts[column] = count
+                vocabulary.frequencies[column] = frequency
+            return
+        self.feature_names = tokens
+        self.vocabulary = {token: i for i, token in enumerate(tokens)}
+        self.dict_counter = dict(zip(tokens, counts))
+        self.document_frequency = dict(zip(tokens, frequencies))
+
+    def _prunes(self) -> bool:
+        """
+        Tell whether min_df, max_df or max_features may drop tokens.
+        """
+        if isinstance(self.min_df, float):
+            prunes_rare = self.min_df > 0.0
+        else:
+            prunes_rare = self.min_df > 1
+        if isinstance(self.max_df, float):
+            prunes_common = self.max_df < 1.0
+        else:
+            prunes_common = True
+        return prunes_rare or prunes_common or self.max_features is not None
+
+    def _limit_features(self, final: bool = True) -> None:
+        """
+        Rebuild the vocabulary from the tokens passing the thresholds.
+
+        Token counts and document frequencies of every token seen are
+        kept, so thresholds are applied to the whole corpus after each
+        fit or partial_fit. max_features tokens are selected with a heap
+        bounded by max_features; ties go to the earlier token. Columns
+        keep the order of first occurrence.
+
+        Args:
+            final: Whether the corpus is complete. After partial_fit
+                more documents may come, so thresholds that cannot be
+                met yet leave the vocabulary empty instead of raising.
+
+        Raises:
+            ValueError: If ``final`` and max_df corresponds to fewer
+                documents than min_df.
+        """
+        n_documents = self.n_documents
+        min_count = (
+            math.ceil(self.min_df * n_documents)
+            if isinstance(self.min_df, float)
+            else self.min_df
+        )
+        max_count = (
+            math.floor(self.max_df * n_documents)
+            if isinstance(self.max_df, float)
+            else self.max_df
+        )
+        if max_count < min_count:
+            if final:
+                raise ValueError("max_df corresponds to fewer documents than min_df.")
+            self.feature_names = []
+            self.vocabulary = {}
+            return
+        kept = (
+            (position, token)
+            for position, (token, frequency) in enumerate(
+                self.document_frequency.items()
+            )
+            if min_count <= frequency <= max_count
+        )
+        if self.max_features is not None:
+            counter = self.dict_counter
+            kept = sorted(
+                heapq.nlargest(
+                    self.max_features,
+                    kept,
+                    key=lambda item: (counter[item[1]], -item[0]),
+                )
+            )
+        self.feature_names = [token for _, token in kept]
+        self.vocabulary = {token: i for i, token in enumerate(self.feature_names)}
 
-    def _tokenize(self, corpus: List[str]) -> None:
+    def _count_shards(
+        self, corpus: Iterable[str], keep_totals: bool = True, keep_rows: bool = True
+    ) -> Iterator[Tuple[int, Dict[str, int], Dict[str, int], List[Dict[str, int]]]]:
         """
-        Tokenize the given corpus.
+        Count tokens shard by shard, in worker processes if ``n_jobs`` > 1.
+
+        Shards are returned in corpus order whatever the number of jobs.
+
+        Args:
+            corpus: An iterable of text documents.
+            keep_totals: Accumulate token counts over every shard.
+            keep_rows: Return token counts of every document.
+
+        Returns:
+            An iterator over shard sizes, shard token counts, shard document
+            frequencies and per-document token counts.
+        """
+        count_shard = partial(
+            _count_shard,
+            analyzer=self.analyzer,
+            keep_totals=keep_totals,
+            keep_rows=keep_rows,
+        )
+        return _map_shards(count_shard, corpus, self.n_jobs)
+
+    def _merge_totals(
+        self, totals: Dict[str, int], document_frequency: Dict[str, int]
+    ) -> None:
+        """
+        Add shard token counts and extend the vocabulary.
+
+        New tokens are appended to the vocabulary in order of first
+        occurrence, so columns learned earlier never move and merging
+        shards in corpus order gives the same columns as a serial pass.
+        When tokens may be pruned the vocabulary is left to
+        _limit_features.
+
+        Args:
+            totals: Token counts of a shard in order of first occurrence.
+            document_frequency: Numbers of shard documents containing
+                every token.
+        """
+        if self.compact:
+            vocabulary = self.vocabulary
+            for token, count in totals.items():
+                column = vocabulary.add(token)
+                vocabulary.counts[column] += count
+                vocabulary.frequencies[column] += document_frequency[token]
+            return
+        grow = not self._prunes()
+        for token, count in totals.items():
+            if token not in self.dict_counter:
+                self.dict_counter[token] = 0
+                self.document_frequency[token] = 0
+                if grow:
+                    self.vocabulary[token] = len(self.feature_names)
+                    self.feature_names.append(token)
+            self.dict_counter[token] += count
+            self.document_frequency[token] += document_frequency[token]
+
+    def _update_counts(
+        self, corpus: Iterable[str], keep_rows: bool = True
+    ) -> Iterator[Dict[str, int]]:
+        """
+        Count the tokens of every document and extend the vocabulary.
+
+        Args:
+            corpus: An iterable of text documents.
+            keep_rows: Yield token counts of every document.
+
+        Yields:
+            Token counts of every document, once the vocabulary has been
+            extended with its shard.
+        """
+        self._thaw()
+        for n_documents, totals, document_frequency, rows in self._count_shards(
+            corpus, keep_rows=keep_rows
+        ):
+            self.n_documents += n_documents
+            self._merge_totals(totals, document_frequency)
+            yield from rows
+
+    def _iter_rows(self, corpus: Iterable[str]) -> Iterator[Dict[str, int]]:
+        """
+        Count the tokens of every document without touching the vocabulary.
+
+        Args:
+            corpus: An iterable of text documents.
+
+        Yields:
+            Token counts of every document.
+        """
+        for *_, rows in self._count_shards(corpus, keep_totals=False):
+            yield from rows
+
+    def _row_columns(self, counts: Dict[str, int]) -> List[Tuple[int, int]]:
+        """
+        Map token counts of a document to sorted (column, count) pairs.
+
+        Tokens missing from the vocabulary are skipped.
+
+        Args:
+            counts: Token counts of a document.
+
+        Returns:
+            Column numbers and counts ordered by column.
+        """
+        vocabulary = self.vocabulary
+        return sorted(
+            (vocabulary[token], count)
+            for token, count in counts.items()
+            if token in vocabulary
+        )
+
+    def _rows_to_csr(self, rows: Iterable[Dict[str, int]]) -> CSRMatrix:
+        """
+        Map per-document token counts to a CSRMatrix.
+
+        Args:
+            rows: Token counts of every document.
+
+        Returns:
+            The document-term matrix in CSR form.
+        """
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("q")
+        for counts in rows:
+            for column, count in self._row_columns(counts):
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        return CSRMatrix(indptr, indices, data, (len(indptr) - 1, len(self.vocabulary)))
+
+    def _output(self, matrix: CSRMatrix) -> Union[List[List[int]], CSRMatrix]:
+        """
+        Return the matrix in the format selected by ``sparse``.
+        """
+        if self.sparse:
+            return matrix
+        return matrix.toarray()
+
+    def partial_fit(self, corpus: Iterable[str]) -> "CountVectorizer":
+        """
+        Extend the vocabulary with the tokens of a batch of documents.
+
+        Only the vocabulary, the token counts and the document
+        frequencies are kept, so the corpus can be streamed in batches of
+        any size.
+
+        Args:
+            corpus: A batch of text documents.
+
+        Returns:
+            The vectorizer itself.
+        """
+        self._fit_batch(corpus, final=False)
+        return self
+
+    def _fit_batch(self, corpus: Iterable[str], final: bool) -> None:
+        """
+        Count a batch of documents and apply the thresholds.
+
+        Args:
+            corpus: A batch of text documents.
+            final: Whether this batch completes the corpus.
+        """
+        for _ in self._update_counts(corpus, keep_rows=False):
+            pass
+        if self._prunes():
+            self._limit_features(final)
+
+    def fit(self, corpus: Iterable[str]) -> "CountVectorizer":
+        """
+        Learn the vocabulary dictionary, discarding any previous one.
 
         Args:
             corpus: A list of text documents.
+
+        Returns:
+            The vectorizer itself.
+
+        Raises:
+            ValueError: If max_df corresponds to fewer documents than
+                min_df.
         """
-        for text in corpus:
-            tokens = text.lower().split()
-            self.tokenized_text.append(tokens)
-            self.tokenized_corpus.extend(tokens)
+        self._reset()
+        self._fit_batch(corpus, final=True)
+        return self
 
-    def _set_feature_names(self) -> None:
+    def transform(self, corpus: Iterable[str]) -> Union[List[List[int]], CSRMatrix]:
         """
-        Create a dictionary counter and set the feature names for the corpus.
+        Count tokens of documents against the learned vocabulary.
+
+        The vocabulary is not changed; unknown tokens are ignored.
+
+        Args:
+            corpus: A list of text documents.
+
+        Returns:
+            The document-term matrix, a CSRMatrix if ``sparse`` is set.
+
+        Raises:
+            ValueError: If the vocabulary has not been learned.
         """
-        self.dict_counter: Dict[str, int] = {}
-        for el in self.tokenized_corpus:
-            self.dict_counter[el] = self.dict_counter.get(el, 0) + 1
-        self.feature_names = list(self.dict_counter.keys())
+        if not self.vocabulary:
+            raise ValueError("Vocabulary is empty, call fit or partial_fit first.")
+        return self._output(self._rows_to_csr(self._iter_rows(corpus)))
+
+    def iter_transform(
+        self, corpus: Iterable[str]
+    ) -> Iterator[Union[List[int], Dict[int, int]]]:
+        """
+        Lazily count tokens of documents against the learned vocabulary.
+
+        This is the second pass of two-pass streaming: after ``fit`` (or
+        a series of ``partial_fit`` calls) over one pass of the corpus,
+        documents are vectorized one at a time, so only a single
+        document is held in memory.
+
+        Args:
+            corpus: An iterable of text documents, e.g. an open file.
+
+        Yields:
+            A dense row, or a ``{column: count}`` dictionary if ``sparse``
+            is set.
+
+        Raises:
+            ValueError: If the vocabulary has not been learned.
+        """
+        if not self.vocabulary:
+            raise ValueError("Vocabulary is empty, call fit or partial_fit first.")
+        n_features = len(self.vocabulary)
+        for counts in self._iter_rows(corpus):
+            columns = self._row_columns(counts)
+            if self.sparse:
+                yield dict(columns)
+            else:
+                row = [0] * n_features
+                for column, count in columns:
+                    row[column] = count
+                yield row
+
+    def iter_fit_transform(self, corpus: Iterable[str]) -> Iterator[Dict[int, int]]:
+        """
+        Learn the vocabulary and vectorize documents in a single pass.
+
+        Columns are assigned in order of first occurrence and never move,
+        so every yielded row stays valid while the vocabulary grows. Rows
+        are always sparse because the final width is not known yet. Any
+        previously learned vocabulary is discarded.
+
+        Args:
+            corpus: An iterable of text documents, e.g. an open file.
+
+        Yields:
+            A ``{column: count}`` dictionary for every document.
+
+        Raises:
+            ValueError: If min_df, max_df or max_features is set, since
+                they need the whole corpus before assigning columns.
+        """
+        if self._prunes():
+            raise ValueError("Vocabulary pruning needs fit or fit_transform.")
+        self._reset()
+        for counts in self._update_counts(corpus):
+            yield dict(self._row_columns(counts))
 
-    def fit_transform(self, corpus: List[str]) -> List[List[int]]:
+    def fit_transform(self, corpus: Iterable[str]) -> Union[List[List[int]], CSRMatrix]:
         """
         Learn the vocabulary dictionary and return document-term matrix.
 
+        Each document is tokenized and counted once; the cost is
+        proportional to the number of tokens plus the number of non-zero
+        entries rather than to documents times vocabulary size. Any
+        previously learned vocabulary is discarded.
+
         Args:
-            corpus: A list of text documents.
+            corpus: An iterable of text documents.
 
         Returns:
-            The document-term matrix.
+            The document-term matrix, a CSRMatrix if ``sparse`` is set.
         """
-        self._tokenize(corpus)
-        self._set_feature_names()
-        output = []
-        for i in range(len(corpus)):
-            tmp = []
-            tokenized_text = self.tokenized_text[i]
-            for token in self.feature_names:
-                tmp.append(tokenized_text.count(token))
-            output.append(tmp)
-        return output
+        self._reset()
+        rows = list(self._update_counts(corpus))
+        if self._prunes():
+            self._limit_features()
+        return self._output(self._rows_to_csr(rows))
 
     def get_feature_names(self) -> List[str]:
         """
         Get feature names (i.e. tokens) for the vectorizer.
 
         Returns:
-            A list of feature names.
+            A list of feature names, copied out of the flat buffers in
+            compact mode or for a model loaded by load_model.
         """
         if self.feature_names:
-            return self.feature_names
+            if isinstance(self.feature_names, list):
+                return self.feature_names
+            return list(self.feature_names)
         warnings.warn("Return None if fit_transform method isn't used.", stacklevel=2)
         return None
 
 
+def _hash_shard(
+    documents: List[str], analyzer: Analyzer, n_features: int, alternate_sign: bool
+) -> List[Dict[int, int]]:
+    """
+    Hash the tokens of a shard of documents to columns.
+
+    This runs in worker processes, so it is a module-level function.
+
+    Args:
+        documents: Documents of the shard.
+        analyzer: The analyzer producing tokens.
+        n_features: Number of columns.
+        alternate_sign: Add or subtract counts depending on the hash.
+
+    Returns:
+        A ``{column: value}`` dictionary for every document, without
+        zero values.
+    """
+    rows = []
+    for text in documents:
+        row: Dict[int, int] = {}
+        for token, count in _count_tokens(text, analyzer).items():
+            hashed = zlib.crc32(token.encode("utf-8"))
+            column = hashed % n_features
+            if alternate_sign and hashed & 0x80000000:
+                count = -count
+            row[column] = row.get(column, 0) + count
+        rows.append({column: row[column] for column in sorted(row) if row[column]})
+    return rows
+
+
+class HashingVectorizer:
+    """
+    Convert a collection of text documents to a matrix of hashed token counts.
+
+    Tokens are mapped to a fixed number of columns with a stable CRC32
+    hash, so there is no vocabulary to learn or store: the vectorizer is
+    stateless, the output width never grows and any shard of a corpus
+    can be vectorized independently. Feature names are not available.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 2**20,
+        alternate_sign: bool = True,
+        sparse: bool = True,
+        n_jobs: int = 1,
+        lowercase: bool = True,
+        token_pattern: Optional[str] = None,
+        stop_words: Optional[Collection[str]] = None,
+        ngram_range: Tuple[int, int] = (1, 1),
+    ) -> None:
+        """
+        Initialize the HashingVectorizer instance.
+
+        Args:
+            n_features: Number of columns of the output matrix.
+            alternate_sign: Use the top hash bit as the sign of a count,
+                so that collisions tend to cancel out instead of adding up.
+            sparse: Return a CSRMatrix instead of a dense list of lists.
+                On by default, as a dense row holds n_features values.
+            n_jobs: Number of worker processes, -1 means all CPUs.
+            lowercase: Convert documents to lowercase before tokenizing.
+            token_pattern: Regular expression matching a token; documents
+                are split on whitespace by default.
+            stop_words: Tokens to drop.
+            ngram_range: Smallest and largest n of word n-grams.
+        """
+        if n_features < 1:
+            raise ValueError("n_features must be a positive integer.")
+        _check_n_jobs(n_jobs)
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.sparse = sparse
+        self.n_jobs = n_jobs
+        self.analyzer = Analyzer(lowercase, token_pattern, stop_words, ngram_range)
+
+    def _iter_rows(self, corpus: Iterable[str]) -> Iterator[Dict[int, int]]:
+        """
+        Hash the tokens of every document.
+
+        Args:
+            corpus: An iterable of text documents.
+
+        Yields:
+            A ``{column: value}`` dictionary for every document.
+        """
+        hash_shard = partial(
+            _hash_shard,
+            analyzer=self.analyzer,
+            n_features=self.n_features,
+            alternate_sign=self.alternate_sign,
+        )
+        for rows in _map_shards(hash_shard, corpus, self.n_jobs):
+            yield from rows
+
+    def fit(self, corpus: Optional[Iterable[str]] = None) -> "HashingVectorizer":
+        """
+        Do nothing, the vectorizer is stateless.
+
+        Returns:
+            The vectorizer itself.
+        """
+        return self
+
+    partial_fit = fit
+
+    def transform(self, corpus: Iterable[str]) -> Union[List[List[int]], CSRMatrix]:
+        """
+        Hash the tokens of documents to a document-term matrix.
+
+        Args:
+            corpus: An iterable of text documents.
+
+        Returns:
+            The document-term matrix, a CSRMatrix if ``sparse`` is set.
+        """
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("q")
+        for row in self._iter_rows(corpus):
+            indices.extend(row.keys())
+            data.extend(row.values())
+            indptr.append(len(indices))
+        matrix = CSRMatrix(indptr, indices, data, (len(indptr) - 1, self.n_features))
+        if self.sparse:
+            return matrix
+        return matrix.toarray()
+
+    fit_transform = transform
+
+    def iter_transform(
+        self, corpus: Iterable[str]
+    ) -> Iterator[Union[List[int], Dict[int, int]]]:
+        """
+        Lazily hash the tokens of documents.
+
+        Args:
+            corpus: An iterable of text documents, e.g. an open file.
+
+        Yields:
+            A dense row, or a ``{column: value}`` dictionary if ``sparse``
+            is set.
+        """
+        for columns in self._iter_rows(corpus):
+            if self.sparse:
+                yield columns
+            else:
+                row = [0] * self.n_features
+                for column, value in columns.items():
+                    row[column] = value
+                yield row
+
+
 if __name__ == "__main__":
+    import tracemalloc
+
     corpus = [
         "Crock Pot Pasta Never boil pasta again",
         "Pasta Pomodoro Fresh ingredients Parmesan to taste",
@@ -104,5 +975,89 @@ if __name__ == "__main__":
     assert names == check_feature_names
     assert count_matrix == check_count_matrix
 
+    sparse_matrix = CountVectorizer(sparse=True).fit_transform(corpus)
+    assert list(sparse_matrix.indptr) == [0, 6, 13]
+    assert sparse_matrix.shape == (2, 12)
+    assert sparse_matrix.toarray() == check_count_matrix
+
+    assert vectorizer.fit_transform(corpus) == check_count_matrix
+    assert vectorizer.get_feature_names() == check_feature_names
+
+    vectorizer = CountVectorizer().partial_fit(corpus[:1]).partial_fit(corpus[1:])
+    assert vectorizer.get_feature_names() == check_feature_names
+    assert vectorizer.transform(["pasta PASTA unknown"]) == [
+        [0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+
+    lines = (line for line in corpus)
+    vectorizer = CountVectorizer().fit(lines)
+    assert list(vectorizer.iter_transform(iter(corpus))) == check_count_matrix
+    assert list(CountVectorizer().iter_fit_transform(iter(corpus)))[1] == {
+        2: 1,
+        6: 1,
+        7: 1,
+        8: 1,
+        9: 1,
+        10: 1,
+        11: 1,
+    }
+
+    parallel = CountVectorizer(sparse=True, n_jobs=2)
+    parallel_matrix = parallel.fit_transform(corpus * 3000)
+    assert parallel.get_feature_names() == check_feature_names
+    assert parallel_matrix.toarray() == check_count_matrix * 3000
+
+    compact = CountVectorizer(compact=True)
+    assert compact.fit_transform(corpus) == check_count_matrix
+    assert compact.get_feature_names() == check_feature_names
+    assert compact.dict_counter["pasta"] == 3
+
+    pruned = CountVectorizer(max_features=3)
+    assert pruned.fit_transform(corpus) == [[1, 1, 2], [0, 0, 1]]
+    assert pruned.get_feature_names() == ["crock", "pot", "pasta"]
+    pruned = CountVectorizer(min_df=2)
+    assert pruned.fit_transform(corpus) == [[2], [1]]
+    pruned = CountVectorizer(min_df=2).partial_fit(corpus[:1])
+    assert pruned.vocabulary == {}
+    assert pruned.partial_fit(corpus[1:]).get_feature_names() == ["pasta"]
+    try:
+        CountVectorizer(min_df=2).fit(corpus[:1])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("fit must reject min_df above max_df")
+    pruned = CountVectorizer(max_df=0.5).fit(corpus)
+    assert "pasta" not in pruned.get_feature_names()
+    assert len(pruned.get_feature_names()) == 11
+
+    analyzed = CountVectorizer(
+        token_pattern=r"(?u)\b\w+\b", stop_words={"to"}, ngram_range=(1, 2)
+    )
+    analyzed.fit(["Pasta, pasta to taste!"])
+    assert analyzed.get_feature_names() == [
+        "pasta",
+        "pasta pasta",
+        "taste",
+        "pasta taste",
+    ]
+
+    hashing = HashingVectorizer(n_features=16)
+    hashed_matrix = hashing.transform(corpus)
+    assert hashed_matrix.shape == (2, 16)
+    assert hashed_matrix.toarray() == HashingVectorizer(
+        n_features=16, sparse=False, n_jobs=2
+    ).transform(corpus)
+    assert sum(map(abs, hashed_matrix.data)) <= sum(map(sum, check_count_matrix))
+
+    tracemalloc.start()
+    default_matrix = HashingVectorizer().transform(corpus * 10)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert default_matrix.shape == (20, 2**20)
+    assert len(default_matrix.data) == 10 * sum(
+        value > 0 for row in check_count_matrix for value in row
+    )
+    assert peak < 2**20
+
     print(f"count matrix : {count_matrix}")
     print(f"feature names: {names}")
@@ -1,21 +1,106 @@
-from typing import List
+from array import array
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
+if TYPE_CHECKING:
+    from issue_1 import CSRMatrix
 
-def tf_transform(count_matrix: List[List[int]]) -> List[List[float]]:
+
+def _sparse_tf_transform(
+    count_matrix: Union[List[Dict[int, int]], "CSRMatrix"], ndigits: Optional[int]
+) -> Union[List[Dict[int, float]], "CSRMatrix"]:
+    """
+    Convert a sparse matrix of term counts to term frequencies.
+
+    Only stored entries are visited.
+
+    :param count_matrix: A CSR matrix or a list of ``{column: count}``
+    dictionaries.
+    :param ndigits: Number of decimals to round to, None to keep
+    full precision.
+    :return: Term frequencies in the same sparse format.
+    """
+    if not hasattr(count_matrix, "indptr"):
+        output = []
+        for sentence in count_matrix:
+            amount_words = sum(sentence.values())
+            output.append(
+                {
+                    column: (
+                        count / amount_words
+                        if ndigits is None
+                        else round(count / amount_words, ndigits)
+                    )
+                    for column, count in sentence.items()
+                }
+            )
+        return output
+
+    indptr, counts = count_matrix.indptr, count_matrix.data
+    data = array("d")
+    for start, stop in zip(indptr, indptr[1:]):
+        amount_words = sum(counts[start:stop])
+        for count in counts[start:stop]:
+            value = count / amount_words
+            data.append(value if ndigits is None else round(value, ndigits))
+    return type(count_matrix)(indptr, count_matrix.indices, data, count_matrix.shape)
+
+
+def tf_transform(
+    count_matrix: List[List[int]],
+    inplace: bool = False,
+    out: Optional[List[List[Union[int, float]]]] = None,
+    ndigits: Optional[int] = 3,
+) -> List[List[float]]:
     """
     Convert a matrix of term counts to term frequencies.
 
-    Each term count is divided by the sum of terms in the sentence,
-    ignoring zeros, and rounded to three decimals.
+    Each term count is divided by the sum of terms in the sentence
+    and rounded to three decimals. The sum is taken in a single pass
+    over the row. The count matrix is left untouched unless
+    ``inplace`` is set.
+
+    A sparse count matrix (a CSR matrix or a list of ``{column: count}``
+    dictionaries) gives a new sparse matrix of the same kind.
 
     :param count_matrix: Matrix of term counts for each sentence.
+    :param inplace: Overwrite the rows of count_matrix instead of
+    allocating a new matrix.
+    :param out: Matrix of the same shape whose rows receive the result
+    instead of a newly allocated matrix.
+    :param ndigits: Number of decimals to round to, None to keep
+    full precision.
     :return: Matrix with term frequencies for each sentence.
     """
-    for sentence in count_matrix:
-        amount_words = sum([el for el in sentence if el != 0])
-        for i in range(len(sentence)):
-            sentence[i] = round(sentence[i] / amount_words, 3)
-    return count_matrix
+    if hasattr(count_matrix, "indptr") or (
+        count_matrix and isinstance(count_matrix[0], dict)
+    ):
+        if inplace or out is not None:
+            raise ValueError("inplace and out apply to dense matrices only.")
+        return _sparse_tf_transform(count_matrix, ndigits)
+    if inplace:
+        if out is not None:
+            raise ValueError("Use either inplace or out, not both.")
+        out = count_matrix
+    if out is None:
+        output = []
+        for sentence in count_matrix:
+            amount_words = sum(sentence)
+            if ndigits is None:
+                output.append([count / amount_words for count in sentence])
+            else:
+                output.append(
+                    [round(count / amount_words, ndigits) for count in sentence]
+                )
+        return output
+
+    if len(out) != len(count_matrix):
+        raise ValueError("out must have as many rows as count_matrix.")
+    for sentence, target in zip(count_matrix, out):
+        amount_words = sum(sentence)
+        for i, count in enumerate(sentence):
+            value = count / amount_words
+            target[i] = value if ndigits is None else round(value, ndigits)
+    return out
 
 
 if __name__ == "__main__":
@@ -31,5 +116,16 @@ if __name__ == "__main__":
     ]
 
     assert tf_matrix == check_tf_matrix
+    assert count_matrix[0][0] == 1
+
+    out = [[0.0] * 12 for _ in count_matrix]
+    assert tf_transform(count_matrix, out=out) is out
+    assert out == check_tf_matrix
+
+    assert tf_transform(count_matrix, inplace=True) is count_matrix
+    assert count_matrix == check_tf_matrix
+
+    sparse_rows = [{0: 1, 1: 1, 2: 2, 3: 1, 4: 1, 5: 1}]
+    assert tf_transform(sparse_rows)[0][2] == 0.286
 
     print(tf_matrix)
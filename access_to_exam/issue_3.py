@@ -1,8 +1,12 @@
 import math
-from typing import List
+from typing import Dict, List, Optional, Union
 
 
-def idf_transform(count_matrix: List[List[int]]) -> List[float]:
+def idf_transform(
+    count_matrix: Union[List[List[int]], List[Dict[int, int]]],
+    n_features: Optional[int] = None,
+    ndigits: Optional[int] = 1,
+) -> List[float]:
     """
     Calculate the inverse document frequency (IDF) for each term.
 
@@ -10,22 +14,47 @@ def idf_transform(count_matrix: List[List[int]]) -> List[float]:
     by the number of documents that contain each term, adjusted
     and rounded to one decimal place.
 
+    Besides a dense list of lists, the count matrix may be sparse: a
+    CSR matrix (any object with ``indptr``, ``indices``, ``data`` and
+    ``shape``) or a list of ``{column: count}`` dictionaries. Document
+    frequencies of sparse matrices are counted over the stored entries
+    only, so the cost is proportional to the number of non-zeros.
+
     :param count_matrix: A matrix where each row represents a document
     and each column a term frequency.
+    :param n_features: Number of terms of a list of dictionaries, by
+    default one more than the largest column.
+    :param ndigits: Number of decimals to round to, None to keep
+    full precision.
     :return: A list of IDF values for each term.
     """
-    n_docs = len(count_matrix)
-    docs_with_words = [0] * len(count_matrix[0])
-    idf_transformation = []
-
-    for doc in count_matrix:
-        for index, count in enumerate(doc):
-            if doc[index] != 0:
+    if hasattr(count_matrix, "indptr"):
+        n_docs, n_features = count_matrix.shape
+        docs_with_words = [0] * n_features
+        for index, count in zip(count_matrix.indices, count_matrix.data):
+            if count != 0:
                 docs_with_words[index] += 1
+    elif count_matrix and isinstance(count_matrix[0], dict):
+        n_docs = len(count_matrix)
+        if n_features is None:
+            n_features = max((max(doc, default=-1) for doc in count_matrix)) + 1
+        docs_with_words = [0] * n_features
+        for doc in count_matrix:
+            for index, count in doc.items():
+                if count != 0:
+                    docs_with_words[index] += 1
+    else:
+        n_docs = len(count_matrix)
+        docs_with_words = [0] * len(count_matrix[0])
+        for doc in count_matrix:
+            for index, count in enumerate(doc):
+                if count != 0:
+                    docs_with_words[index] += 1
 
+    idf_transformation = []
     for el in docs_with_words:
-        res = round(math.log((n_docs + 1) / (el + 1)) + 1, 1)
-        idf_transformation.append(res)
+        res = math.log((n_docs + 1) / (el + 1)) + 1
+        idf_transformation.append(res if ndigits is None else round(res, ndigits))
 
     return idf_transformation
 
@@ -41,4 +70,10 @@ if __name__ == "__main__":
 
     assert idf_matrix == check_idf_matrix
 
+    sparse_rows = [
+        {column: count for column, count in enumerate(doc) if count}
+        for doc in count_matrix
+    ]
+    assert idf_transform(sparse_rows) == check_idf_matrix
+
     print(idf_matrix)
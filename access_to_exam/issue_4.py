@@ -1,5 +1,15 @@
-import math
-from typing import List
+from array import array
+from typing import Any, Dict, List, Optional, Union
+
+from issue_2 import tf_transform
+from issue_3 import idf_transform
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKENDS = ("python", "numpy")
 
 
 class TfidfTransformer:
@@ -13,28 +23,53 @@ class TfidfTransformer:
     to compute the TF-IDF matrix.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        backend: str = "python",
+        dtype: str = "float64",
+        rounding: Optional[bool] = None,
+        keep_tf: bool = False,
+    ):
         """
         Initialize the TfidfTransformer with empty TF and IDF matrices.
+
+        :param backend: "python" for nested lists or "numpy" for array
+        operations returning an ndarray; the latter requires numpy.
+        :param dtype: Float type of the arrays of the numpy backend,
+        e.g. "float32" to halve memory.
+        :param rounding: Round TF to three decimals, IDF to one and TF-IDF
+        to three, as the original implementation does. By default only
+        the python backend rounds.
+        :param keep_tf: Keep a copy of the TF matrix of the numpy backend
+        in tf_matrix. It is off by default because the copy doubles the
+        peak memory; the python backend always keeps its TF matrix.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}.")
+        if backend == "numpy" and np is None:
+            raise ImportError("The numpy backend requires numpy to be installed.")
+        self.backend = backend
+        self.dtype = dtype
+        self.rounding = backend == "python" if rounding is None else rounding
+        self.keep_tf = keep_tf
         self.tf_matrix = None
         self.idf_matrix = None
 
-    def _tf_transform(self, count_matrix: List[List[int]]) -> None:
+    def _tf_transform(
+        self, count_matrix: List[List[int]], inplace: bool = False
+    ) -> None:
         """
         Convert a matrix of term counts to term frequencies.
 
-        Each term count is divided by the sum of terms in the sentence,
-        ignoring zeros, and rounded to three decimals.
+        Each term count is divided by the sum of terms in the sentence
+        and rounded to three decimals.
 
         :param count_matrix: Matrix of term counts for each sentence.
-        :return: Matrix with term frequencies for each sentence.
+        :param inplace: Overwrite the rows of count_matrix.
         """
-        for sentence in count_matrix:
-            amount_words = sum([el for el in sentence if el != 0])
-            for i in range(len(sentence)):
-                sentence[i] = round(sentence[i] / amount_words, 3)
-        self.tf_matrix = count_matrix
+        self.tf_matrix = tf_transform(
+            count_matrix, inplace=inplace, ndigits=3 if self.rounding else None
+        )
 
     def _idf_transform(self, count_matrix: List[List[int]]) -> None:
         """
@@ -42,28 +77,82 @@ class TfidfTransformer:
 
         IDF is computed as the logarithm of the number
         of documents divided by the number of documents that contain each term,
-        adjusted and rounded to one decimal place.
+        adjusted and rounded to one decimal place. Sparse matrices are
+        scanned over their non-zero entries only.
 
         :param count_matrix: A matrix where each row represents a document
         and each column a term frequency.
-        :return: A list of IDF values for each term.
         """
-        n_docs = len(count_matrix)
-        docs_with_words = [0] * len(count_matrix[0])
-        idf_transformation = []
+        self.idf_matrix = idf_transform(
+            count_matrix, ndigits=1 if self.rounding else None
+        )
+
+    def _fit_transform_numpy(self, count_matrix) -> "np.ndarray":
+        """
+        Perform TF-IDF transformation with numpy array operations.
 
-        for doc in count_matrix:
-            for index, _ in enumerate(doc):
-                if doc[index] != 0:
-                    docs_with_words[index] += 1
+        Row sums, document frequencies, the smoothed IDF and the product
+        are each computed by a single vectorized operation on a copy of
+        the count matrix, which is then reused for the result. The TF
+        matrix is copied into tf_matrix only if ``keep_tf`` is set.
 
-        for el in docs_with_words:
-            res = round(math.log((n_docs + 1) / (el + 1)) + 1, 1)
-            idf_transformation.append(res)
+        :param count_matrix: Matrix of term counts for each document.
+        :return: TF-IDF matrix as an ndarray of the configured dtype.
+        """
+        if hasattr(count_matrix, "indptr") or isinstance(count_matrix[0], dict):
+            raise TypeError("The numpy backend expects a dense count matrix.")
+        matrix = np.array(count_matrix, dtype=self.dtype)
+        n_docs = matrix.shape[0]
+        docs_with_words = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((n_docs + 1) / (docs_with_words + 1)) + 1).astype(self.dtype)
+        matrix /= matrix.sum(axis=1, keepdims=True)
+        if self.rounding:
+            matrix.round(3, out=matrix)
+            idf.round(1, out=idf)
+        self.tf_matrix = matrix.copy() if self.keep_tf else None
+        self.idf_matrix = idf
+        matrix *= idf
+        if self.rounding:
+            matrix.round(3, out=matrix)
+        return matrix
+
+    def _multiply(self) -> Union[List[List[float]], List[Dict[int, float]], Any]:
+        """
+        Multiply the TF matrix by the IDF vector.
 
-        self.idf_matrix = idf_transformation
+        Sparse TF matrices keep their format and only their stored
+        entries are multiplied.
+
+        :return: TF-IDF matrix.
+        """
+        idf = self.idf_matrix
+        ndigits = 3 if self.rounding else None
+
+        def weight(tf_value: float, idf_value: float) -> float:
+            value = tf_value * idf_value
+            return value if ndigits is None else round(value, ndigits)
+
+        tf_matrix = self.tf_matrix
+        if hasattr(tf_matrix, "indptr"):
+            data = array(
+                "d", map(weight, tf_matrix.data, (idf[i] for i in tf_matrix.indices))
+            )
+            return type(tf_matrix)(
+                tf_matrix.indptr, tf_matrix.indices, data, tf_matrix.shape
+            )
+        if tf_matrix and isinstance(tf_matrix[0], dict):
+            return [
+                {column: weight(value, idf[column]) for column, value in row.items()}
+                for row in tf_matrix
+            ]
+        return [
+            [weight(tf_value, idf_value) for tf_value, idf_value in zip(tf_row, idf)]
+            for tf_row in tf_matrix
+        ]
 
-    def fit_transform(self, count_matrix: List[List[int]]) -> List[List[float]]:
+    def fit_transform(
+        self, count_matrix: List[List[int]], inplace: bool = False
+    ) -> Union[List[List[float]], List[Dict[int, float]], Any]:
         """
         Perform TF-IDF transformation on the given count matrix.
 
@@ -71,21 +160,26 @@ class TfidfTransformer:
         inverse document frequency transformation
         to compute the TF-IDF matrix.
 
+        The python backend also accepts sparse count matrices (a CSR
+        matrix or a list of ``{column: count}`` dictionaries) and then
+        returns a sparse TF-IDF matrix of the same kind, touching only
+        non-zero entries.
+
         :param count_matrix: Matrix of term counts for each document.
-        :return: TF-IDF matrix.
+        :param inplace: Let the python backend overwrite count_matrix with
+        term frequencies instead of allocating a new matrix.
+        :return: TF-IDF matrix, an ndarray with the numpy backend.
         """
-        self._tf_transform(count_matrix)
+        if self.backend == "numpy":
+            return self._fit_transform_numpy(count_matrix)
+        self._tf_transform(count_matrix, inplace=inplace)
         self._idf_transform(count_matrix)
-        return [
-            [
-                round(tf_value * idf_value, 3)
-                for tf_value, idf_value in zip(tf_row, self.idf_matrix)
-            ]
-            for tf_row in self.tf_matrix
-        ]
+        return self._multiply()
 
 
 if __name__ == "__main__":
+    import math
+
     count_matrix = [
         [1, 1, 2, 1, 1, 1, 0, 0, 0, 0, 0, 0],
         [0, 0, 1, 0, 0, 0, 1, 1, 1, 1, 1, 1],
@@ -99,5 +193,38 @@ if __name__ == "__main__":
     ]
 
     assert tfidf_matrix == check_tfidf_matrix
+    assert count_matrix[0][2] == 2
+
+    unrounded = TfidfTransformer(rounding=False).fit_transform(count_matrix)
+    assert unrounded[0][0] == 1 / 7 * (math.log(3 / 2) + 1)
+    assert unrounded[0][2] == 2 / 7
+
+    sparse_rows = [
+        {column: count for column, count in enumerate(doc) if count}
+        for doc in count_matrix
+    ]
+    sparse_tfidf = TfidfTransformer().fit_transform(sparse_rows)
+    assert sparse_tfidf[1] == {
+        2: 0.143,
+        6: 0.2,
+        7: 0.2,
+        8: 0.2,
+        9: 0.2,
+        10: 0.2,
+        11: 0.2,
+    }
+
+    if np is not None:
+        numpy_transformer = TfidfTransformer(backend="numpy", rounding=True)
+        assert numpy_transformer.fit_transform(count_matrix).tolist() == tfidf_matrix
+        assert numpy_transformer.tf_matrix is None
+        kept = TfidfTransformer(backend="numpy", rounding=True, keep_tf=True)
+        kept.fit_transform(count_matrix)
+        assert kept.tf_matrix.tolist() == transformer.tf_matrix
+        float32_matrix = TfidfTransformer(
+            backend="numpy", dtype="float32"
+        ).fit_transform(count_matrix)
+        assert float32_matrix.dtype == np.float32
+        assert np.allclose(float32_matrix, tfidf_matrix, atol=1e-3)
 
     print(f"tf-idf matrix : {tfidf_matrix}")
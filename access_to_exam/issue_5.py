@@ -1,7 +1,9 @@
 import math
-from typing import List
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 
-from issue_1 import CountVectorizer
+from issue_1 import CountVectorizer, CSRMatrix
+from vocabulary import TokenCounts
 
 
 class TfidfVectorizer(CountVectorizer):
@@ -13,81 +15,260 @@ class TfidfVectorizer(CountVectorizer):
     It provides methods to transform this matrix into a term frequency (TF)
     matrix and then inverse document frequency (IDF) transformation
     to compute the TF-IDF matrix.
+
+    Document frequencies and the number of documents are kept up to date
+    by partial_fit, which touches only the tokens of the new documents.
+    idf_matrix is computed from them on first use and cached until the
+    next fit or partial_fit, so transform, iter_transform and reweight
+    always use the statistics of every document seen so far without
+    refitting the corpus, and weight every entry with a list lookup.
     """
 
-    def __init__(self):
+    def __init__(self, rounding: bool = True, **kwargs: Any):
         """
         Initialize the TfidfTransformer with empty TF and IDF matrices.
+
+        :param rounding: Round TF to three decimals, IDF to one and TF-IDF
+        to three, as the original implementation does.
+        :param kwargs: Options of CountVectorizer, e.g. n_jobs, min_df,
+        max_df, max_features, token_pattern, stop_words or ngram_range.
         """
-        super().__init__()
+        super().__init__(**kwargs)
+        self.rounding = rounding
         self.tf_matrix = None
         self.idf_matrix = None
 
-    def _tf_transform(self, count_matrix: List[List[int]]) -> None:
+    @property
+    def idf_matrix(self) -> Optional[Sequence[float]]:
+        """
+        IDF of every column, computed on first use after the statistics
+        change; None before the first fit.
+        """
+        if self._idf is None and self.n_documents:
+            self._idf = self.get_idf()
+        return self._idf
+
+    @idf_matrix.setter
+    def idf_matrix(self, idf: Optional[Sequence[float]]) -> None:
+        self._idf = idf
+
+    def _reset(self) -> None:
+        """
+        Forget the learned vocabulary, token counts and IDF.
         """
-        Convert a matrix of term counts to term frequencies.
+        super()._reset()
+        self._idf = None
 
-        Each term count is divided by the sum of terms in the sentence,
-        ignoring zeros, and rounded to three decimals.
+    def _merge_totals(
+        self, totals: Dict[str, int], document_frequency: Dict[str, int]
+    ) -> None:
+        """
+        Add shard token counts and mark the IDF as stale.
+        """
+        super()._merge_totals(totals, document_frequency)
+        self._idf = None
 
-        :param count_matrix: Matrix of term counts for each sentence.
-        :return: Matrix with term frequencies for each sentence.
+    def _limit_features(self, final: bool = True) -> None:
         """
-        for sentence in count_matrix:
-            amount_words = sum([el for el in sentence if el != 0])
-            for i in range(len(sentence)):
-                sentence[i] = round(sentence[i] / amount_words, 3)
-        self.tf_matrix = count_matrix
+        Apply the thresholds and mark the IDF as stale.
+        """
+        super()._limit_features(final)
+        self._idf = None
 
-    def _idf_transform(self, count_matrix: List[List[int]]) -> None:
+    def fit_transform(
+        self, corpus: Iterable[str]
+    ) -> Union[List[List[float]], CSRMatrix]:
         """
-        Calculate the inverse document frequency (IDF) for each term.
+        Learn the vocabulary and IDF and return the TF-IDF matrix.
 
-        IDF is computed as the logarithm of the number
-        of documents divided by the number of documents that contain each term,
-        adjusted and rounded to one decimal place.
+        Documents are tokenized once into sparse token counts that also
+        feed the document frequencies; a single weighting pass then turns
+        every row into TF and TF-IDF at once. No dense count or TF matrix
+        is built, so tf_matrix stays None.
 
-        :param count_matrix: A matrix where each row represents a document
-        and each column a term frequency.
-        :return: A list of IDF values for each term.
+        :param corpus: An iterable of text documents.
+        :return: TF-IDF matrix, a CSRMatrix if ``sparse`` is set.
         """
-        n_docs = len(count_matrix)
-        docs_with_words = [0] * len(count_matrix[0])
-        idf_transformation = []
+        self._reset()
+        rows = list(self._update_counts(corpus))
+        if self._prunes():
+            self._limit_features()
+        return self._rows_output(self.reweight(self._tf_rows(rows)))
 
-        for doc in count_matrix:
-            for index, _ in enumerate(doc):
-                if doc[index] != 0:
-                    docs_with_words[index] += 1
+    def iter_fit_transform(self, corpus: Iterable[str]) -> Iterator[Dict[int, float]]:
+        """
+        Learn the vocabulary and compute TF-IDF rows in a single pass.
+
+        Every row is weighted with the statistics of the documents seen
+        up to the end of its shard, as partial_fit_transform does for a
+        batch, so early rows use fewer documents than the final IDF;
+        reweight their transform_tf rows to bring them up to date. Rows
+        are always sparse and any previously learned vocabulary is
+        discarded.
 
-        for el in docs_with_words:
-            res = round(math.log((n_docs + 1) / (el + 1)) + 1, 1)
-            idf_transformation.append(res)
+        :param corpus: An iterable of text documents, e.g. an open file.
+        :return: An iterator over ``{column: tf-idf}`` dictionaries.
+        :raises ValueError: If min_df, max_df or max_features is set.
+        """
+        if self._prunes():
+            raise ValueError("Vocabulary pruning needs fit or fit_transform.")
+        self._reset()
+        yield from self.reweight(self._tf_rows(self._update_counts(corpus)))
 
-        self.idf_matrix = idf_transformation
+    def _round(self, value: float, ndigits: int) -> float:
+        """
+        Round a value if rounding is enabled.
+        """
+        return round(value, ndigits) if self.rounding else value
 
-    def fit_transform(self, corpus: List[str]) -> List[List[int]]:
+    def get_idf(self) -> List[float]:
         """
-        Perform TF-IDF transformation on the given count matrix.
+        Calculate the IDF of every feature from the current statistics.
 
-        This method applies term frequency transformation followed by
-        inverse document frequency transformation
-        to compute the TF-IDF matrix.
+        Compact and loaded vocabularies keep document frequencies in
+        column order, so they are read without decoding any token.
 
-        :param count_matrix: Matrix of term counts for each document.
-        :return: TF-IDF matrix.
+        :return: A list of IDF values for each term.
         """
-        count_matrix = super().fit_transform(corpus)
-        self._tf_transform(count_matrix)
-        self._idf_transform(count_matrix)
+        document_frequency = self.document_frequency
+        if isinstance(document_frequency, TokenCounts):
+            frequencies = document_frequency.by_column()
+        else:
+            frequencies = [document_frequency[token] for token in self.feature_names]
+        n_documents = self.n_documents + 1
         return [
-            [
-                round(tf_value * idf_value, 3)
-                for tf_value, idf_value in zip(tf_row, self.idf_matrix)
-            ]
-            for tf_row in self.tf_matrix
+            self._round(math.log(n_documents / (frequency + 1)) + 1, 1)
+            for frequency in frequencies
         ]
 
+    def _tf_rows(self, rows: Iterable[Dict[str, int]]) -> Iterator[Dict[int, float]]:
+        """
+        Lazily turn token counts into term frequencies of known columns.
+
+        :param rows: Token counts of every document.
+        :return: An iterator over ``{column: tf}`` dictionaries.
+        """
+        for counts in rows:
+            columns = self._row_columns(counts)
+            amount_words = sum(count for _, count in columns)
+            yield {
+                column: self._round(count / amount_words, 3)
+                for column, count in columns
+            }
+
+    def transform_tf(self, corpus: Iterable[str]) -> Iterator[Dict[int, float]]:
+        """
+        Lazily compute term frequencies against the learned vocabulary.
+
+        The result does not depend on document frequencies, so it can be
+        stored and turned into TF-IDF later with reweight.
+
+        :param corpus: An iterable of text documents.
+        :return: An iterator over ``{column: tf}`` dictionaries.
+        """
+        if not self.vocabulary:
+            raise ValueError("Vocabulary is empty, call fit or partial_fit first.")
+        return self._tf_rows(self._iter_rows(corpus))
+
+    def reweight(
+        self, tf_rows: Iterable[Dict[int, float]]
+    ) -> Iterator[Dict[int, float]]:
+        """
+        Lazily weight term frequencies by the current IDF.
+
+        This is the only weighting step: every TF-IDF output goes
+        through it. Only the stored entries of every row are visited, so
+        vectors transformed earlier can be brought up to date after
+        partial_fit in time proportional to their non-zeros. Columns must
+        still mean the same terms, which holds unless min_df, max_df or
+        max_features prune the vocabulary.
+
+        :param tf_rows: ``{column: tf}`` dictionaries from transform_tf.
+        :return: An iterator over ``{column: tf-idf}`` dictionaries.
+        """
+        for row in tf_rows:
+            idf = self.idf_matrix
+            yield {
+                column: self._round(tf * idf[column], 3) for column, tf in row.items()
+            }
+
+    def iter_transform(
+        self, corpus: Iterable[str]
+    ) -> Iterator[Union[List[float], Dict[int, float]]]:
+        """
+        Lazily compute TF-IDF vectors with the current statistics.
+
+        :param corpus: An iterable of text documents, e.g. an open file.
+        :return: An iterator over dense rows, or ``{column: tf-idf}``
+        dictionaries if ``sparse`` is set.
+        """
+        n_features = len(self.vocabulary)
+        for row in self.reweight(self.transform_tf(corpus)):
+            if self.sparse:
+                yield row
+            else:
+                dense = [0.0] * n_features
+                for column, value in row.items():
+                    dense[column] = value
+                yield dense
+
+    def _rows_output(
+        self, rows: Iterable[Dict[int, float]]
+    ) -> Union[List[List[float]], CSRMatrix]:
+        """
+        Collect ``{column: value}`` rows into the output format.
+
+        :param rows: Sparse rows ordered by column.
+        :return: The matrix, a CSRMatrix if ``sparse`` is set.
+        """
+        if not self.sparse:
+            n_features = len(self.vocabulary)
+            output = []
+            for row in rows:
+                dense = [0.0] * n_features
+                for column, value in row.items():
+                    dense[column] = value
+                output.append(dense)
+            return output
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("d")
+        for row in rows:
+            indices.extend(row.keys())
+            data.extend(row.values())
+            indptr.append(len(indices))
+        return CSRMatrix(indptr, indices, data, (len(indptr) - 1, len(self.vocabulary)))
+
+    def transform(self, corpus: Iterable[str]) -> Union[List[List[float]], CSRMatrix]:
+        """
+        Compute the TF-IDF matrix of documents with the current statistics.
+
+        Neither the vocabulary nor the document frequencies are changed;
+        unknown tokens are ignored.
+
+        :param corpus: An iterable of text documents.
+        :return: TF-IDF matrix, a CSRMatrix if ``sparse`` is set.
+        """
+        return self._rows_output(self.reweight(self.transform_tf(corpus)))
+
+    def partial_fit_transform(
+        self, corpus: Iterable[str]
+    ) -> Union[List[List[float]], CSRMatrix]:
+        """
+        Add a batch of documents to the statistics and return its TF-IDF.
+
+        The batch is tokenized once; its token counts update the
+        document frequencies before being weighted.
+
+        :param corpus: A batch of text documents.
+        :return: TF-IDF matrix of the batch, a CSRMatrix if ``sparse`` is
+        set.
+        """
+        rows = list(self._update_counts(corpus))
+        if self._prunes():
+            self._limit_features(final=False)
+        return self._rows_output(self.reweight(self._tf_rows(rows)))
+
 
 if __name__ == "__main__":
     corpus = [
@@ -105,4 +286,39 @@ if __name__ == "__main__":
 
     assert tfidf_matrix == check_tfidf_matrix
 
+    sparse_matrix = TfidfVectorizer(sparse=True).fit_transform(iter(corpus))
+    assert sparse_matrix.toarray() == check_tfidf_matrix
+
+    parallel_matrix = TfidfVectorizer(n_jobs=2).fit_transform(corpus)
+    assert parallel_matrix == check_tfidf_matrix
+
+    incremental = TfidfVectorizer(sparse=True).partial_fit(corpus[:1])
+    stored_tf = list(incremental.transform_tf(corpus[:1]))
+    assert incremental.idf_matrix is incremental.idf_matrix
+    assert incremental.partial_fit_transform(corpus[1:]).shape == (1, 12)
+    assert incremental.get_idf() == transformer.idf_matrix
+    assert incremental.idf_matrix == transformer.idf_matrix
+    assert list(incremental.reweight(stored_tf)) == [
+        {0: 0.2, 1: 0.2, 2: 0.286, 3: 0.2, 4: 0.2, 5: 0.2}
+    ]
+    assert incremental.transform(corpus).toarray() == check_tfidf_matrix
+
+    streamed = TfidfVectorizer()
+    rows = list(streamed.iter_fit_transform(corpus))
+    assert rows == [
+        {column: value for column, value in enumerate(row) if value}
+        for row in check_tfidf_matrix
+    ]
+    assert streamed.idf_matrix == transformer.idf_matrix
+    assert TfidfVectorizer().partial_fit(corpus).idf_matrix == transformer.idf_matrix
+
+    lazy = TfidfVectorizer().partial_fit(corpus[:1])
+    assert lazy.idf_matrix == [1.0] * 6
+    lazy.partial_fit(corpus[1:])
+    assert lazy._idf is None
+    assert lazy.idf_matrix == transformer.idf_matrix
+    assert (
+        TfidfVectorizer(compact=True).fit(corpus).idf_matrix == transformer.idf_matrix
+    )
+
     print(f"tf-idf matrix : {tfidf_matrix}")
@@ -0,0 +1,207 @@
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from issue_1 import CSRMatrix
+
+Matrix = Union[List[List[float]], List[Dict[int, float]], CSRMatrix]
+Vector = Union[Sequence[float], Dict[int, float]]
+
+
+def _sparse_row(vector: Vector) -> Dict[int, float]:
+    """
+    Convert a dense or sparse row to a ``{column: value}`` dictionary.
+
+    :param vector: A dense row or a ``{column: value}`` dictionary.
+    :return: The non-zero entries of the row.
+    """
+    if isinstance(vector, dict):
+        return {column: value for column, value in vector.items() if value}
+    return {column: value for column, value in enumerate(vector) if value}
+
+
+def iter_sparse_rows(matrix: Matrix) -> Iterator[Dict[int, float]]:
+    """
+    Iterate over the rows of a matrix as ``{column: value}`` dictionaries.
+
+    :param matrix: A dense matrix, a list of dictionaries or a CSRMatrix.
+    :return: An iterator over the non-zero entries of every row.
+    """
+    if isinstance(matrix, CSRMatrix):
+        indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+        for start, stop in zip(indptr, indptr[1:]):
+            yield {indices[j]: data[j] for j in range(start, stop) if data[j]}
+    else:
+        for row in matrix:
+            yield _sparse_row(row)
+
+
+def _normalize_row(row: Dict[int, float]) -> Dict[int, float]:
+    """
+    Scale a sparse row to unit Euclidean length.
+
+    :param row: A ``{column: value}`` dictionary.
+    :return: The scaled row, or the row itself if it is all zeros.
+    """
+    norm = math.sqrt(sum(value * value for value in row.values()))
+    if not norm:
+        return row
+    return {column: value / norm for column, value in row.items()}
+
+
+def l2_normalize(matrix: Matrix) -> Matrix:
+    """
+    Scale every row of a matrix to unit Euclidean (L2) length.
+
+    The input is left untouched and the result has the same format.
+    All-zero rows stay all zeros.
+
+    :param matrix: A dense matrix, a list of dictionaries or a CSRMatrix.
+    :return: The normalized matrix.
+    """
+    if isinstance(matrix, CSRMatrix):
+        data = array("d")
+        indptr = matrix.indptr
+        for start, stop in zip(indptr, indptr[1:]):
+            values = matrix.data[start:stop]
+            norm = math.sqrt(sum(value * value for value in values)) or 1.0
+            data.extend(value / norm for value in values)
+        return CSRMatrix(indptr, matrix.indices, data, matrix.shape)
+    if matrix and isinstance(matrix[0], dict):
+        return [_normalize_row(row) for row in matrix]
+    output = []
+    for row in matrix:
+        norm = math.sqrt(sum(value * value for value in row)) or 1.0
+        output.append([value / norm for value in row])
+    return output
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity search over the rows of a (TF-IDF) matrix.
+
+    Rows are L2-normalized and stored in an inverted index that maps
+    every column to the documents with a non-zero value in it. A query
+    only visits the postings of its own non-zero columns, so its cost
+    depends on the documents sharing terms with it rather than on the
+    size of the corpus.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty SimilarityIndex.
+        """
+        self.postings: Dict[int, Tuple[array, array]] = {}
+        self.n_documents = 0
+
+    def add(self, matrix: Union[Matrix, Iterable[Vector]]) -> "SimilarityIndex":
+        """
+        Add the rows of a matrix to the index.
+
+        Documents are numbered in order of addition.
+
+        :param matrix: A dense matrix, a list of dictionaries or a
+        CSRMatrix, e.g. the output of TfidfVectorizer.
+        :return: The index itself.
+        """
+        for row in iter_sparse_rows(matrix):
+            document = self.n_documents
+            for column, value in _normalize_row(row).items():
+                if column not in self.postings:
+                    self.postings[column] = (array("q"), array("d"))
+                documents, weights = self.postings[column]
+                documents.append(document)
+                weights.append(value)
+            self.n_documents += 1
+        return self
+
+    def fit(self, matrix: Matrix) -> "SimilarityIndex":
+        """
+        Index the rows of a matrix, discarding previous documents.
+
+        :param matrix: A dense matrix, a list of dictionaries or a
+        CSRMatrix.
+        :return: The index itself.
+        """
+        self.postings = {}
+        self.n_documents = 0
+        return self.add(matrix)
+
+    def _scores(self, row: Dict[int, float]) -> Dict[int, float]:
+        """
+        Accumulate cosine similarities over the postings of a query.
+
+        :param row: A normalized query row.
+        :return: Similarity of every document sharing a column with it.
+        """
+        scores: Dict[int, float] = {}
+        for column, query_value in row.items():
+            if column not in self.postings:
+                continue
+            documents, weights = self.postings[column]
+            for document, weight in zip(documents, weights):
+                scores[document] = scores.get(document, 0.0) + query_value * weight
+        return scores
+
+    def query(self, vector: Vector, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Find the documents most similar to a vector.
+
+        :param vector: A dense row or a ``{column: value}`` dictionary in
+        the column space of the indexed matrix.
+        :param k: Maximum number of documents to return.
+        :return: ``(document, cosine similarity)`` pairs, most similar
+        first; documents sharing no column with the vector are omitted.
+        """
+        scores = self._scores(_normalize_row(_sparse_row(vector)))
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def similar_pairs(
+        self, matrix: Matrix, threshold: float
+    ) -> Iterator[Tuple[int, int, float]]:
+        """
+        Find pairs of indexed documents at least ``threshold`` similar.
+
+        Meant for near-duplicate detection: ``matrix`` is the matrix the
+        index was fitted on, and every row is queried against the
+        inverted index instead of being compared with all other rows.
+
+        :param matrix: The indexed matrix.
+        :param threshold: Minimum cosine similarity.
+        :return: An iterator over ``(document, other, similarity)``
+        triples with ``document < other``.
+        """
+        for document, row in enumerate(iter_sparse_rows(matrix)):
+            scores = self._scores(_normalize_row(row))
+            for other in sorted(scores):
+                if other > document and scores[other] >= threshold:
+                    yield document, other, scores[other]
+
+
+if __name__ == "__main__":
+    from issue_5 import TfidfVectorizer
+
+    corpus = [
+        "Crock Pot Pasta Never boil pasta again",
+        "Pasta Pomodoro Fresh ingredients Parmesan to taste",
+        "Crock pot pasta never boil pasta again!",
+        "Fresh ingredients",
+    ]
+    vectorizer = TfidfVectorizer(sparse=True, rounding=False)
+    tfidf_matrix = vectorizer.fit_transform(corpus)
+
+    normalized = l2_normalize(tfidf_matrix)
+    for row in iter_sparse_rows(normalized):
+        assert abs(sum(value * value for value in row.values()) - 1) < 1e-9
+
+    index = SimilarityIndex().fit(tfidf_matrix)
+    query = vectorizer.transform(["fresh pomodoro"]).toarray()[0]
+    top = index.query(query, k=2)
+    assert [document for document, _ in top] == [1, 3]
+
+    pairs = list(index.similar_pairs(tfidf_matrix, threshold=0.8))
+    assert [(document, other) for document, other, _ in pairs] == [(0, 2)]
+
+    print(f"top-2 for 'fresh pomodoro': {top}")
+    print(f"near duplicates: {pairs}")
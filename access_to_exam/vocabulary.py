@@ -0,0 +1,456 @@
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple, Union
+
+if TYPE_CHECKING:
+    from issue_1 import CountVectorizer
+
+MAGIC = b"VECTMODL"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQQQ")
+HEADER_SIZE = 64
+EMPTY = -1
+
+
+def hash_token(encoded: bytes) -> int:
+    """
+    Hash an encoded token for the open-addressing table.
+
+    :param encoded: UTF-8 bytes of the token.
+    :return: A stable unsigned 32-bit hash.
+    """
+    return zlib.crc32(encoded)
+
+
+def table_size_for(n_tokens: int) -> int:
+    """
+    Choose the size of the hash table for a number of tokens.
+
+    The size is a power of two at least twice the number of tokens, so
+    the table is at most half full and probe sequences stay short.
+
+    :param n_tokens: Number of tokens to store.
+    :return: Number of slots.
+    """
+    size = 8
+    while size < 2 * n_tokens:
+        size *= 2
+    return size
+
+
+class TokenIndex(Mapping):
+    """
+    Read-only token to column mapping over flat buffers.
+
+    Tokens are stored as one buffer of concatenated UTF-8 bytes with an
+    offsets array: the token of column ``i`` is
+    ``tokens[offsets[i]:offsets[i + 1]]``. Lookups go through an
+    open-addressing hash table of column numbers with linear probing.
+    The buffers may be arrays, bytes or memoryviews of a memory-mapped
+    file, so no Python object is created per token.
+    """
+
+    __slots__ = ("_tokens", "_offsets", "_table", "_mask")
+
+    def __init__(self, tokens: Any, offsets: Any, table: Any) -> None:
+        """
+        Initialize the TokenIndex instance.
+
+        :param tokens: Concatenated UTF-8 bytes of every token.
+        :param offsets: Start of every token in ``tokens`` plus the end
+        of the last one.
+        :param table: Hash table of column numbers, -1 for empty slots;
+        its size must be a power of two.
+        """
+        self._tokens = tokens
+        self._offsets = offsets
+        self._table = table
+        self._mask = len(table) - 1
+
+    def _probe(self, encoded: bytes) -> Tuple[int, int]:
+        """
+        Find the slot of an encoded token in the hash table.
+
+        :param encoded: UTF-8 bytes of the token.
+        :return: The slot and the column of the token, or the empty slot
+        where it belongs and -1 if the token is unknown.
+        """
+        tokens, offsets, table, mask = (
+            self._tokens,
+            self._offsets,
+            self._table,
+            self._mask,
+        )
+        slot = hash_token(encoded) & mask
+        while True:
+            column = table[slot]
+            if column == EMPTY:
+                return slot, EMPTY
+            start, stop = offsets[column], offsets[column + 1]
+            if stop - start == len(encoded) and tokens[start:stop] == encoded:
+                return slot, column
+            slot = (slot + 1) & mask
+
+    def _find(self, encoded: bytes) -> int:
+        """
+        Look up the column of an encoded token.
+
+        :param encoded: UTF-8 bytes of the token.
+        :return: The column, or -1 if the token is unknown.
+        """
+        return self._probe(encoded)[1]
+
+    def token(self, column: int) -> str:
+        """
+        Get the token of a column.
+
+        :param column: Column number.
+        :return: The token.
+        """
+        start, stop = self._offsets[column], self._offsets[column + 1]
+        return bytes(self._tokens[start:stop]).decode("utf-8")
+
+    def __getitem__(self, token: str) -> int:
+        column = self._find(token.encode("utf-8"))
+        if column == EMPTY:
+            raise KeyError(token)
+        return column
+
+    def __contains__(self, token: object) -> bool:
+        return isinstance(token, str) and self._find(token.encode("utf-8")) != EMPTY
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        for column in range(len(self)):
+            yield self.token(column)
+
+
+class TokenList(Sequence):
+    """
+    Feature names of a TokenIndex, in column order.
+    """
+
+    __slots__ = ("_index",)
+
+    def __init__(self, index: TokenIndex) -> None:
+        """
+        Initialize the TokenList instance.
+
+        :param index: The index holding the tokens.
+        """
+        self._index = index
+
+    def __getitem__(self, column: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(column, slice):
+            return [self._index.token(i) for i in range(len(self))[column]]
+        if column < 0:
+            column += len(self)
+        if not 0 <= column < len(self):
+            raise IndexError("column out of range")
+        return self._index.token(column)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class TokenCounts(Mapping):
+    """
+    Read-only token to count mapping backed by a TokenIndex and an array.
+    """
+
+    __slots__ = ("_index", "_counts")
+
+    def __init__(self, index: TokenIndex, counts: Any) -> None:
+        """
+        Initialize the TokenCounts instance.
+
+        :param index: The index giving the column of a token.
+        :param counts: Count of every column.
+        """
+        self._index = index
+        self._counts = counts
+
+    def __getitem__(self, token: str) -> int:
+        return self._counts[self._index[token]]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def by_column(self) -> Any:
+        """
+        Return the count of every column without decoding the tokens.
+        """
+        return self._counts
+
+
+class CompactVocabulary(TokenIndex):
+    """
+    Growable token index with token counts and document frequencies.
+
+    Compared with a dict of tokens plus a list of feature names plus a
+    dict of counts, every token costs its UTF-8 bytes, an 8-byte offset,
+    two 8-byte counters and at most two 8-byte hash slots instead of
+    several Python objects. Tokens are never removed.
+    """
+
+    __slots__ = ("counts", "frequencies")
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty CompactVocabulary.
+        """
+        super().__init__(bytearray(), array("Q", [0]), array("q", [EMPTY]) * 8)
+        self.counts = array("Q")
+        self.frequencies = array("Q")
+
+    def add(self, token: str) -> int:
+        """
+        Get the column of a token, appending it if it is new.
+
+        :param token: The token.
+        :return: Its column.
+        """
+        encoded = token.encode("utf-8")
+        slot, column = self._probe(encoded)
+        if column != EMPTY:
+            return column
+        column = len(self)
+        self._tokens += encoded
+        self._offsets.append(len(self._tokens))
+        self.counts.append(0)
+        self.frequencies.append(0)
+        self._table[slot] = column
+        if 2 * len(self) > len(self._table):
+            self._resize()
+        return column
+
+    def _resize(self) -> None:
+        """
+        Double the hash table and reinsert every column.
+        """
+        table = array("q", [EMPTY]) * (2 * len(self._table))
+        mask = len(table) - 1
+        tokens, offsets = self._tokens, self._offsets
+        for column in range(len(self)):
+            start, stop = offsets[column], offsets[column + 1]
+            slot = hash_token(tokens[start:stop]) & mask
+            while table[slot] != EMPTY:
+                slot = (slot + 1) & mask
+            table[slot] = column
+        self._table = table
+        self._mask = mask
+
+
+def _config(vectorizer: "CountVectorizer") -> Dict[str, Any]:
+    """
+    Collect the constructor options of a vectorizer.
+
+    :param vectorizer: A CountVectorizer or TfidfVectorizer.
+    :return: JSON-serializable class name and options.
+    """
+    from issue_5 import TfidfVectorizer
+
+    analyzer = vectorizer.analyzer
+    params = {
+        "sparse": vectorizer.sparse,
+        "n_jobs": vectorizer.n_jobs,
+        "min_df": vectorizer.min_df,
+        "max_df": vectorizer.max_df,
+        "max_features": vectorizer.max_features,
+        "compact": vectorizer.compact,
+        "lowercase": analyzer.lowercase,
+        "token_pattern": analyzer.token_pattern,
+        "stop_words": sorted(analyzer.stop_words),
+        "ngram_range": list(analyzer.ngram_range),
+    }
+    if isinstance(vectorizer, TfidfVectorizer):
+        params["rounding"] = vectorizer.rounding
+    return {
+        "class": type(vectorizer).__name__,
+        "byteorder": sys.byteorder,
+        "params": params,
+    }
+
+
+def _pad(size: int) -> int:
+    """
+    Round a size up to a multiple of 8 bytes.
+    """
+    return (size + 7) // 8 * 8
+
+
+def save_model(vectorizer: "CountVectorizer", path: str) -> None:
+    """
+    Save a fitted vectorizer to a memory-mappable binary file.
+
+    The file holds a fixed header, the vectorizer options as JSON and
+    then 8-byte aligned arrays: token offsets, token counts, document
+    frequencies, the hash table, the IDF of a TfidfVectorizer, and the
+    concatenated UTF-8 tokens. Only tokens of the vocabulary are saved.
+
+    :param vectorizer: A fitted CountVectorizer or TfidfVectorizer.
+    :param path: Path of the file to write.
+    """
+    if not vectorizer.vocabulary:
+        raise ValueError("Vocabulary is empty, call fit or partial_fit first.")
+    feature_names = vectorizer.feature_names
+    encoded = [token.encode("utf-8") for token in feature_names]
+    offsets = array("Q", [0])
+    for token in encoded:
+        offsets.append(offsets[-1] + len(token))
+    counts = array("Q", (vectorizer.dict_counter[token] for token in feature_names))
+    frequencies = array(
+        "Q", (vectorizer.document_frequency[token] for token in feature_names)
+    )
+    table = array("q", [EMPTY]) * table_size_for(len(encoded))
+    mask = len(table) - 1
+    for column, token in enumerate(encoded):
+        slot = hash_token(token) & mask
+        while table[slot] != EMPTY:
+            slot = (slot + 1) & mask
+        table[slot] = column
+    has_idf = hasattr(vectorizer, "get_idf")
+    idf = array("d", vectorizer.idf_matrix if has_idf else [])
+    config = json.dumps(_config(vectorizer)).encode("utf-8")
+
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        has_idf,
+        len(config),
+        len(encoded),
+        vectorizer.n_documents,
+        len(table),
+        offsets[-1],
+    )
+    with open(path, "wb") as file:
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        file.write(config.ljust(_pad(len(config)), b"\0"))
+        for section in (offsets, counts, frequencies, table, idf):
+            file.write(section.tobytes())
+        for token in encoded:
+            file.write(token)
+
+
+def load_model(path: str) -> "CountVectorizer":
+    """
+    Load a vectorizer saved by save_model without copying its arrays.
+
+    The file is memory-mapped read-only and the vocabulary, token counts,
+    document frequencies and IDF are views of it, so loading takes
+    constant time and processes loading the same file share one copy in
+    the page cache. The loaded vectorizer can transform documents right
+    away; partial_fit copies the vocabulary into regular structures
+    before updating it, and fit learns a new one.
+
+    :param path: Path of a file written by save_model.
+    :return: The vectorizer, of the saved class.
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    (
+        magic,
+        version,
+        has_idf,
+        config_size,
+        n_features,
+        n_documents,
+        table_size,
+        tokens_size,
+    ) = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a vectorizer model file.")
+    config_end = HEADER_SIZE + config_size
+    config = json.loads(bytes(view[HEADER_SIZE:config_end]))
+    if config["byteorder"] != sys.byteorder:
+        raise ValueError(f"{path} was saved on a machine of another byte order.")
+    position = HEADER_SIZE + _pad(config_size)
+
+    def section(typecode: str, length: int) -> memoryview:
+        nonlocal position
+        start, position = position, position + 8 * length
+        return view[start:position].cast(typecode)
+
+    offsets = section("Q", n_features + 1)
+    counts = section("Q", n_features)
+    frequencies = section("Q", n_features)
+    table = section("q", table_size)
+    idf = section("d", n_features if has_idf else 0)
+    tokens_end = position + tokens_size
+    tokens = view[position:tokens_end]
+
+    from issue_1 import CountVectorizer
+    from issue_5 import TfidfVectorizer
+
+    vectorizers = {
+        "CountVectorizer": CountVectorizer,
+        "TfidfVectorizer": TfidfVectorizer,
+    }
+    params = config["params"]
+    params["ngram_range"] = tuple(params["ngram_range"])
+    vectorizer = vectorizers[config["class"]](**params)
+    index = TokenIndex(tokens, offsets, table)
+    vectorizer.vocabulary = index
+    vectorizer.feature_names = TokenList(index)
+    vectorizer.dict_counter = TokenCounts(index, counts)
+    vectorizer.document_frequency = TokenCounts(index, frequencies)
+    vectorizer.n_documents = n_documents
+    if has_idf:
+        vectorizer.idf_matrix = idf
+    return vectorizer
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    import issue_1
+    from issue_5 import TfidfVectorizer
+
+    corpus = [
+        "Crock Pot Pasta Never boil pasta again",
+        "Pasta Pomodoro Fresh ingredients Parmesan to taste",
+    ]
+    vectorizer = TfidfVectorizer()
+    tfidf_matrix = vectorizer.fit_transform(corpus)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.bin")
+        save_model(vectorizer, path)
+        loaded = load_model(path)
+
+        assert isinstance(loaded, TfidfVectorizer)
+        assert loaded.get_feature_names() == vectorizer.get_feature_names()
+        assert loaded.vocabulary["pasta"] == 2
+        assert "unknown" not in loaded.vocabulary
+        assert loaded.document_frequency["pasta"] == 2
+        assert list(loaded.idf_matrix) == vectorizer.idf_matrix
+        assert loaded.transform(corpus) == tfidf_matrix
+        assert isinstance(loaded.idf_matrix, memoryview)
+
+        loaded.partial_fit(["Pasta salad"])
+        assert loaded.vocabulary["salad"] == len(vectorizer.vocabulary)
+        assert loaded.dict_counter["pasta"] == vectorizer.dict_counter["pasta"] + 1
+        assert loaded.n_documents == 3
+        assert loaded.get_feature_names()[:-1] == vectorizer.get_feature_names()
+
+        vectorizer = issue_1.CountVectorizer(compact=True)
+        vectorizer.fit(corpus)
+        save_model(vectorizer, path)
+        loaded = load_model(path)
+        loaded.partial_fit(["Pasta salad"])
+        assert type(loaded.vocabulary).__name__ == "CompactVocabulary"
+        assert loaded.document_frequency["pasta"] == 3
+        assert loaded.vocabulary["salad"] == len(vectorizer.vocabulary)
+        print(f"loaded {len(loaded.vocabulary)} features from {path}")
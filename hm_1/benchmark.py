@@ -0,0 +1,225 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+from columnar import EmployeeTable
+from employee_index import EmployeeIndex
+from parallel_report import make_salary_report_parallel
+from parse_csv import PATH, iter_rows, make_salary_report
+from quantiles import percentile_key
+
+QUERIES = [
+    {'department': 'Разработка', 'position': 'Backend-инженер',
+     'rating_min': 4.5},
+    {'branch': 'Платформа', 'salary_min': 120000},
+    {'position': 'Бухгалтер', 'rating_min': 4.9, 'salary_max': 60000},
+    {'salary_min': 124000},
+]
+HEADER = 'ФИО полностью;Департамент;Отдел;Должность;Оценка;Оклад\r\n'
+
+
+def generate_file(file_path: str, n_rows: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic HR export with n_rows employees.
+
+    Names, departments, branches and positions are sampled from the
+    rows of Corp_Summary.csv; ratings and salaries are random.
+
+    Parameters:
+    - file_path (str): The path of the CSV file to write.
+    - n_rows (int): The number of employees.
+    - seed (int): The seed of the generator.
+    """
+    rng = random.Random(seed)
+    templates = [
+        ';'.join([
+            row['ФИО полностью'],
+            row['Департамент'],
+            row['Отдел'],
+            row['Должность'],
+        ])
+        for row in iter_rows(PATH)
+    ]
+    with open(file_path, 'w', encoding='utf-8', newline='') as file:
+        file.write(HEADER)
+        batch = 100000
+        for start in range(0, n_rows, batch):
+            size = min(batch, n_rows - start)
+            file.writelines([
+                f'{template};{rng.randint(30, 50) / 10};'
+                f'{rng.randint(500, 1250) * 100}\r\n'
+                for template in rng.choices(templates, k=size)
+            ])
+
+
+def timed(function: Callable[[], object]) -> float:
+    """
+    Returns the wall time of a function call in seconds.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def benchmark_salary_report(
+        file_path: str,
+        n_jobs: Optional[int] = None
+        ) -> Dict[str, float]:
+    """
+    Times the serial and the parallel salary report on a CSV file.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - n_jobs (Optional[int]): Worker processes of the parallel report.
+
+    Returns:
+    - Dict[str, float]: Seconds per implementation.
+    """
+    return {
+        'serial': timed(lambda: make_salary_report(iter_rows(file_path))),
+        'parallel': timed(
+            lambda: make_salary_report_parallel(file_path, n_jobs)
+        ),
+    }
+
+
+def benchmark_percentiles(
+        file_path: str,
+        percentiles: Sequence[float] = (50, 90, 99)
+        ) -> Dict[str, Dict[str, float]]:
+    """
+    Compares exact and sketched salary percentiles on a CSV file.
+
+    Each mode runs once for the wall time and once under tracemalloc
+    for the peak of Python allocations.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - percentiles (Sequence[float]): The percentiles to compute.
+
+    Returns:
+    - Dict[str, Dict[str, float]]: Seconds, peak MiB and the largest
+    relative error against the exact mode, per mode.
+    """
+    results = {}
+    reports = {}
+    for name, exact in (('exact', True), ('sketch', False)):
+        def function():
+            return make_salary_report(
+                iter_rows(file_path), percentiles, exact
+            )
+
+        seconds = timed(function)
+        tracemalloc.start()
+        reports[name] = function()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        results[name] = {'seconds': seconds, 'peak_mib': peak}
+
+    error = 0.0
+    for department, info in reports['exact'].items():
+        for percentile in percentiles:
+            key = percentile_key(percentile)
+            estimate = reports['sketch'][department][key]
+            error = max(error, abs(estimate - info[key]) / info[key])
+    results['exact']['max_error'] = 0.0
+    results['sketch']['max_error'] = error
+    return results
+
+
+def benchmark_queries(file_path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Compares indexed queries with a linear scan of the same table.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+
+    Returns:
+    - Dict[str, Dict[str, float]]: Per query, the number of matches and
+    the seconds of the indexed query and of the scan; the build time of
+    the indexes under 'index'.
+    """
+    table = EmployeeTable.from_file(file_path)
+    results = {}
+    start = time.perf_counter()
+    index = EmployeeIndex(table)
+    results['index'] = {'seconds': time.perf_counter() - start}
+    for kwargs in QUERIES:
+        name = ', '.join(f'{key}={value}' for key, value in kwargs.items())
+        results[name] = {
+            'matches': len(index.query(**kwargs)),
+            'query': timed(lambda: index.query(**kwargs)),
+            'scan': timed(lambda: index.scan(**kwargs)),
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Runs the benchmarks from the command line.
+
+    Parameters:
+    - argv (Optional[List[str]]): Command line arguments, sys.argv by
+    default.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the salary reports on a generated file.'
+    )
+    names = ['salary', 'percentiles', 'queries']
+    parser.add_argument(
+        'benchmarks', nargs='*',
+        help=f"any of {', '.join(names)}, all by default"
+    )
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--file', help='reuse or keep the generated CSV at this path'
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(names)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    benchmarks = args.benchmarks or names
+
+    file_path = args.file
+    if file_path is None:
+        descriptor, file_path = tempfile.mkstemp(suffix='.csv')
+        os.close(descriptor)
+    try:
+        if args.file is None or not os.path.exists(args.file):
+            generate_file(file_path, args.rows, args.seed)
+        size = os.path.getsize(file_path) / 2**20
+        print(f'{file_path}: {size:.0f} MiB')
+        if 'salary' in benchmarks:
+            for name, seconds in benchmark_salary_report(
+                    file_path, args.n_jobs
+                    ).items():
+                print(f'{name:<10} {seconds:>8.2f} s')
+        if 'percentiles' in benchmarks:
+            for name, result in benchmark_percentiles(file_path).items():
+                print(
+                    f"{name:<10} {result['seconds']:>8.2f} s "
+                    f"{result['peak_mib']:>8.1f} MiB "
+                    f"{result['max_error']:>8.2%} max error"
+                )
+        if 'queries' in benchmarks:
+            results = benchmark_queries(file_path)
+            print(f"indexes built in {results.pop('index')['seconds']:.2f} s")
+            for name, result in results.items():
+                print(
+                    f"{result['query'] * 1000:>9.2f} ms indexed "
+                    f"{result['scan'] * 1000:>9.0f} ms scan "
+                    f"{result['matches']:>7} matches  {name}"
+                )
+    finally:
+        if args.file is None:
+            os.remove(file_path)
+
+
+if __name__ == '__main__':
+    main()
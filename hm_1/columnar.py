@@ -0,0 +1,198 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from parse_csv import (
+    PATH, add_value, finish_stats, iter_rows, make_hierarchy,
+    make_salary_report
+)
+
+NAME = 'ФИО полностью'
+CATEGORIES = ('Департамент', 'Отдел', 'Должность')
+NUMBERS = ('Оценка', 'Оклад')
+
+
+class EmployeeTable:
+    """
+    Columnar in-memory storage of employee records.
+
+    Salary and rating are kept in array('d') columns, parsed once at
+    load. Department, branch and position are dictionary-encoded: each
+    column keeps its distinct values once and an array('I') of integer
+    codes per employee. Names are packed into one UTF-8 buffer with
+    an array of offsets. On Corp_Summary.csv an employee costs about
+    105 bytes against about 776 for a dictionary of six strings: 28
+    for the codes and typed columns, 8 for the name offset and the
+    rest for the UTF-8 name itself.
+
+    Attributes:
+    - values (Dict[str, List[str]]): Distinct values of each category
+    column, in order of first appearance; a code is an index here.
+    - codes (Dict[str, array]): Codes of each category column.
+    - numbers (Dict[str, array]): Rating and salary columns.
+    """
+
+    def __init__(self) -> None:
+        self.values = {column: [] for column in CATEGORIES}
+        self.codes = {column: array('I') for column in CATEGORIES}
+        self.numbers = {column: array('d') for column in NUMBERS}
+        self._lookup = {column: {} for column in CATEGORIES}
+        self._names = bytearray()
+        self._offsets = array('Q', [0])
+
+    @classmethod
+    def from_rows(cls, data: Iterable[Dict[str, Any]]) -> 'EmployeeTable':
+        """
+        Builds a table from dictionaries with the CSV columns.
+
+        Parameters:
+        - data (Iterable[Dict[str, Any]]): A list or a row generator
+        such as iter_rows.
+
+        Returns:
+        - EmployeeTable: The table holding every row of data.
+        """
+        table = cls()
+        for row in data:
+            table.append(row)
+        return table
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'EmployeeTable':
+        """
+        Streams a CSV file specified by file_path into a table.
+
+        Parameters:
+        - file_path (str): The path to the CSV file to be read.
+
+        Returns:
+        - EmployeeTable: The table holding every row of the file.
+        """
+        return cls.from_rows(iter_rows(file_path))
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """
+        Adds an employee to the table.
+
+        Parameters:
+        - row (Dict[str, Any]): A dictionary with the CSV columns.
+        """
+        for column in CATEGORIES:
+            value = row[column]
+            lookup = self._lookup[column]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.values[column])
+                self.values[column].append(value)
+            self.codes[column].append(code)
+        for column in NUMBERS:
+            self.numbers[column].append(float(row[column]))
+        self._names += row[NAME].encode('utf-8')
+        self._offsets.append(len(self._names))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def code(self, column: str, value: str) -> Optional[int]:
+        """
+        Returns the code of a value of a category column, None if no
+        employee has it.
+        """
+        return self._lookup[column].get(value)
+
+    def name(self, index: int) -> str:
+        """
+        Returns the full name of the employee at index.
+        """
+        start = self._offsets[index]
+        stop = self._offsets[index + 1]
+        return self._names[start:stop].decode('utf-8')
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """
+        Decodes the employee at index into a dictionary like the rows
+        of read_file, with rating and salary as floats.
+        """
+        row = {NAME: self.name(index)}
+        for column in CATEGORIES:
+            row[column] = self.values[column][self.codes[column][index]]
+        for column in NUMBERS:
+            row[column] = self.numbers[column][index]
+        return row
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def nbytes(self) -> int:
+        """
+        Returns the approximate memory taken by the table in bytes.
+        """
+        size = sys.getsizeof(self._names) + sys.getsizeof(self._offsets)
+        for column in CATEGORIES:
+            size += sys.getsizeof(self.codes[column])
+            size += sum(map(sys.getsizeof, self.values[column]))
+        for column in NUMBERS:
+            size += sys.getsizeof(self.numbers[column])
+        return size
+
+    def make_hierarchy(self) -> Dict[str, Set[str]]:
+        """
+        Same as parse_csv.make_hierarchy, computed on the codes.
+
+        Returns:
+        - Dict[str, Set[str]]: A dictionary where keys are department
+        names and values are sets of branches within those departments.
+        """
+        departments = self.values['Департамент']
+        branches = self.values['Отдел']
+        hierarchy = {department: set() for department in departments}
+        pairs = set(zip(self.codes['Департамент'], self.codes['Отдел']))
+        for department, branch in pairs:
+            if branches[branch] not in departments[department]:
+                hierarchy[departments[department]].add(branches[branch])
+        return hierarchy
+
+    def make_salary_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Same as parse_csv.make_salary_report, computed on the typed
+        salary column and the department codes with the same
+        accumulator.
+
+        Returns:
+        - Dict[str, Dict[str, float]]: A dictionary where the key is a
+        department and the value is another dictionary containing
+        'count', 'min', 'max', and 'average' salary data.
+        """
+        departments = self.values['Департамент']
+        stats = {}
+        for code, salary in zip(
+                self.codes['Департамент'], self.numbers['Оклад']
+                ):
+            add_value(stats, departments[code], salary)
+        return finish_stats(stats)
+
+
+def _row_nbytes(data: List[Dict[str, Any]]) -> int:
+    """
+    Returns the approximate memory taken by rows of read_file in bytes.
+    """
+    size = sys.getsizeof(data)
+    for row in data:
+        size += sys.getsizeof(row) + sum(map(sys.getsizeof, row.values()))
+    return size
+
+
+if __name__ == '__main__':
+    data = list(iter_rows(PATH))
+    table = EmployeeTable.from_rows(data)
+
+    assert len(table) == len(data)
+    assert table.name(0) == data[0][NAME]
+    assert table.row(0)['Оклад'] == float(data[0]['Оклад'])
+    assert table.make_hierarchy() == make_hierarchy(data)
+    assert table.make_salary_report() == make_salary_report(data)
+    assert make_salary_report(table) == make_salary_report(data)
+
+    print(f'dict rows: {_row_nbytes(data) / len(data):.0f} bytes/employee')
+    print(f'columnar:  {table.nbytes() / len(table):.0f} bytes/employee')
@@ -0,0 +1,224 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from columnar import CATEGORIES, EmployeeTable
+from parse_csv import PATH
+
+FILTERS = {
+    'department': 'Департамент',
+    'branch': 'Отдел',
+    'position': 'Должность',
+}
+RANGES = {
+    'salary': 'Оклад',
+    'rating': 'Оценка',
+}
+
+
+class EmployeeIndex:
+    """
+    Secondary indexes over an EmployeeTable.
+
+    Department, branch and position have hash indexes: an array of
+    row numbers per value code. Salary and rating have sorted indexes:
+    the row numbers ordered by value next to the sorted values, searched
+    with bisect. A query starts from the smallest candidate list its
+    filters give and checks the other filters on the typed columns, so
+    its cost follows the size of that list instead of the table.
+
+    Attributes:
+    - table (EmployeeTable): The indexed employees.
+    """
+
+    def __init__(self, table: EmployeeTable) -> None:
+        self.table = table
+        self._postings = {}
+        for column in CATEGORIES:
+            postings = [array('I') for _ in table.values[column]]
+            for row, code in enumerate(table.codes[column]):
+                postings[code].append(row)
+            self._postings[column] = postings
+
+        self._sorted = {}
+        for column in RANGES.values():
+            numbers = table.numbers[column]
+            order = sorted(range(len(table)), key=numbers.__getitem__)
+            rows = array('I', order)
+            values = array('d', [numbers[row] for row in rows])
+            self._sorted[column] = rows, values
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'EmployeeIndex':
+        """
+        Loads a CSV file specified by file_path and indexes it.
+        """
+        return cls(EmployeeTable.from_file(file_path))
+
+    def _range(
+            self,
+            column: str,
+            low: Optional[float],
+            high: Optional[float]
+            ) -> array:
+        rows, values = self._sorted[column]
+        start = 0 if low is None else bisect_left(values, low)
+        stop = len(values) if high is None else bisect_right(values, high)
+        return rows[start:stop]
+
+    def query(
+            self,
+            department: Optional[str] = None,
+            branch: Optional[str] = None,
+            position: Optional[str] = None,
+            salary_min: Optional[float] = None,
+            salary_max: Optional[float] = None,
+            rating_min: Optional[float] = None,
+            rating_max: Optional[float] = None
+            ) -> List[int]:
+        """
+        Finds the employees matching every given filter.
+
+        Parameters:
+        - department, branch, position (Optional[str]): Exact values.
+        - salary_min, salary_max, rating_min, rating_max
+        (Optional[float]): Inclusive bounds.
+
+        Returns:
+        - List[int]: Row numbers of the matches in table order; decode
+        them with table.row.
+        """
+        filters, ranges = self._parse(
+            department, branch, position,
+            salary_min, salary_max, rating_min, rating_max
+        )
+        if not filters and not ranges:
+            return list(range(len(self.table)))
+        codes = self._codes(filters)
+        if codes is None:
+            return []
+
+        candidates = [
+            self._postings[column][code] for column, code in codes.items()
+        ]
+        candidates += [
+            self._range(column, low, high)
+            for column, (low, high) in ranges.items()
+        ]
+        matches = self._filter(min(candidates, key=len), codes, ranges)
+        matches.sort()
+        return matches
+
+    def scan(
+            self,
+            department: Optional[str] = None,
+            branch: Optional[str] = None,
+            position: Optional[str] = None,
+            salary_min: Optional[float] = None,
+            salary_max: Optional[float] = None,
+            rating_min: Optional[float] = None,
+            rating_max: Optional[float] = None
+            ) -> List[int]:
+        """
+        Same as query by checking every row of the typed columns, the
+        baseline the indexes are measured against.
+        """
+        filters, ranges = self._parse(
+            department, branch, position,
+            salary_min, salary_max, rating_min, rating_max
+        )
+        codes = self._codes(filters)
+        if codes is None:
+            return []
+        return self._filter(range(len(self.table)), codes, ranges)
+
+    def _codes(self, filters: Dict[str, str]) -> Optional[Dict[str, int]]:
+        """
+        Maps exact filters to value codes, None if a value is unknown.
+        """
+        codes = {}
+        for column, value in filters.items():
+            codes[column] = self.table.code(column, value)
+            if codes[column] is None:
+                return None
+        return codes
+
+    def _filter(
+            self,
+            rows: Iterable[int],
+            codes: Dict[str, int],
+            ranges: Dict[str, Tuple]
+            ) -> List[int]:
+        """
+        Keeps the rows whose codes and numbers pass every filter.
+        """
+        checks = [
+            (self.table.codes[column], code) for column, code in codes.items()
+        ]
+        bounds = [
+            (
+                self.table.numbers[column],
+                -float('inf') if low is None else low,
+                float('inf') if high is None else high,
+            )
+            for column, (low, high) in ranges.items()
+        ]
+        return [
+            row for row in rows
+            if all(column[row] == code for column, code in checks)
+            and all(low <= numbers[row] <= high
+                    for numbers, low, high in bounds)
+        ]
+
+    @staticmethod
+    def _parse(
+            department: Optional[str],
+            branch: Optional[str],
+            position: Optional[str],
+            salary_min: Optional[float],
+            salary_max: Optional[float],
+            rating_min: Optional[float],
+            rating_max: Optional[float]
+            ) -> Tuple[Dict[str, str], Dict[str, Tuple]]:
+        """
+        Maps the query arguments to columns: exact values and the
+        (low, high) bounds of the given ranges.
+        """
+        given = {
+            'department': department,
+            'branch': branch,
+            'position': position,
+        }
+        filters = {
+            FILTERS[name]: value
+            for name, value in given.items() if value is not None
+        }
+        bounds = {
+            'salary': (salary_min, salary_max),
+            'rating': (rating_min, rating_max),
+        }
+        ranges = {
+            RANGES[name]: (low, high)
+            for name, (low, high) in bounds.items()
+            if low is not None or high is not None
+        }
+        return filters, ranges
+
+
+if __name__ == '__main__':
+    index = EmployeeIndex.from_file(PATH)
+    queries = [
+        {'department': 'Разработка', 'position': 'Backend-инженер',
+         'rating_min': 4.5},
+        {'branch': 'Платформа'},
+        {'salary_min': 100000, 'salary_max': 110000},
+        {'position': 'Бухгалтер', 'rating_max': 4.0, 'salary_min': 60000},
+        {'department': 'Нет такого'},
+        {},
+    ]
+    for kwargs in queries:
+        assert index.query(**kwargs) == index.scan(**kwargs), kwargs
+    for row in index.query(department='Разработка', rating_min=4.5):
+        employee = index.table.row(row)
+        assert employee['Департамент'] == 'Разработка'
+        assert employee['Оценка'] >= 4.5
@@ -0,0 +1,134 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from parse_csv import PATH, add_value, iter_rows, make_salary_report
+
+FUNCTIONS = ('count', 'sum', 'min', 'max', 'mean')
+STATISTICS = {'sum': 'total', 'min': 'min', 'max': 'max'}
+
+Aggregation = Tuple[str, Optional[str]]
+
+
+def aggregation_name(aggregation: Aggregation) -> str:
+    """
+    Returns the result key of an aggregation, e.g. 'mean_Оклад'.
+    """
+    function, column = aggregation
+    return function if column is None else f'{function}_{column}'
+
+
+def group_by(
+        data: Iterable[Dict[str, Any]],
+        keys: Sequence[str],
+        aggregations: Sequence[Aggregation]
+        ) -> Dict[Tuple[str, ...], Dict[str, float]]:
+    """
+    Groups rows by key columns and aggregates them in a single pass.
+
+    Groups live in a dictionary keyed by the tuple of key values, each
+    with the running statistics of parse_csv.add_value per numeric
+    column, so any grouping costs one hash lookup per row.
+
+    Parameters:
+    - data (Iterable[Dict[str, Any]]): A list or a row generator such
+    as iter_rows.
+    - keys (Sequence[str]): Key columns, e.g. ['Департамент', 'Отдел'].
+    - aggregations (Sequence[Aggregation]): Pairs of a function of
+    FUNCTIONS and a numeric column such as 'Оклад' or 'Оценка'; the
+    column of 'count' is None.
+
+    Returns:
+    - Dict[Tuple[str, ...], Dict[str, float]]: Aggregates keyed by
+    aggregation_name per group, groups in order of first appearance.
+    """
+    for function, column in aggregations:
+        if function not in FUNCTIONS:
+            raise ValueError(f'unknown aggregation function: {function}')
+        if (column is None) != (function == 'count'):
+            raise ValueError(f'{function} needs a column, count does not')
+
+    columns = sorted({column for _, column in aggregations if column})
+    groups = {}
+    counts = {}
+    for row in data:
+        key = tuple(row[column] for column in keys)
+        stats = groups.get(key)
+        if stats is None:
+            stats = groups[key] = {}
+            counts[key] = 0
+        counts[key] += 1
+        for column in columns:
+            add_value(stats, column, float(row[column]))
+
+    results = {}
+    for key, stats in groups.items():
+        result = {}
+        for aggregation in aggregations:
+            function, column = aggregation
+            if function == 'count':
+                value = counts[key]
+            elif function == 'mean':
+                value = stats[column]['total'] / counts[key]
+            else:
+                value = stats[column][STATISTICS[function]]
+            result[aggregation_name(aggregation)] = value
+        results[key] = result
+    return results
+
+
+def pivot(
+        groups: Dict[Tuple[str, ...], Dict[str, float]],
+        value: str,
+        fill: Any = None
+        ) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """
+    Spreads the second key of two-key groups into columns.
+
+    Parameters:
+    - groups (Dict[Tuple[str, ...], Dict[str, float]]): The output of
+    group_by with two key columns.
+    - value (str): The aggregation to show, e.g. 'count'.
+    - fill (Any): The value of missing combinations.
+
+    Returns:
+    - Tuple[List[str], Dict[str, Dict[str, Any]]]: The column values in
+    order of first appearance and the table keyed by row then column.
+    """
+    columns = list(dict.fromkeys(column for _, column in groups))
+    table = {}
+    for (row, column), result in groups.items():
+        table.setdefault(row, dict.fromkeys(columns, fill))[column] = \
+            result[value]
+    return columns, table
+
+
+if __name__ == '__main__':
+    data = list(iter_rows(PATH))
+
+    groups = group_by(
+        data,
+        ['Департамент'],
+        [('count', None), ('min', 'Оклад'), ('max', 'Оклад'),
+         ('mean', 'Оклад')],
+    )
+    report = make_salary_report(data)
+    for (department,), result in groups.items():
+        assert result['count'] == report[department]['count']
+        assert result['min_Оклад'] == report[department]['min']
+        assert result['max_Оклад'] == report[department]['max']
+        assert round(result['mean_Оклад'], 0) \
+            == report[department]['average']
+
+    groups = group_by(
+        data, ['Департамент', 'Должность'], [('count', None)]
+    )
+    assert sum(result['count'] for result in groups.values()) == len(data)
+    positions, table = pivot(groups, 'count', fill=0)
+    assert sum(map(sum, (row.values() for row in table.values()))) \
+        == len(data)
+
+    try:
+        group_by(data, ['Отдел'], [('median', 'Оклад')])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('median is not an aggregation function')
@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional
+
+from parallel_report import (
+    aggregate_range,
+    chunk_bounds,
+    merge_partials,
+    read_header,
+)
+from parse_csv import (
+    PATH, finish_stats, iter_rows, main, make_salary_report
+)
+
+FINGERPRINT_SIZE = 64
+STATE_VERSION = 2
+
+
+def state_path_for(file_path: str) -> str:
+    """
+    Returns the default path of the saved state of a CSV file.
+    """
+    return file_path + '.state.json'
+
+
+def complete_size(file_path: str) -> int:
+    """
+    Returns the offset right after the last line break of a file, so a
+    row that is still being appended is left for the next refresh.
+    """
+    with open(file_path, 'rb') as file:
+        size = file.seek(0, os.SEEK_END)
+        while size > 0:
+            start = max(size - 4096, 0)
+            file.seek(start)
+            block = file.read(size - start)
+            index = block.rfind(b'\n')
+            if index >= 0:
+                return start + index + 1
+            size = start
+    return 0
+
+
+def fingerprint(file_path: str, offset: int) -> str:
+    """
+    Returns the bytes right before offset as hex, used to notice that a
+    file was rewritten rather than appended to.
+    """
+    start = max(offset - FINGERPRINT_SIZE, 0)
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        return file.read(offset - start).hex()
+
+
+def load_state(state_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads a saved state, None if there is none.
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_state(state_path: str, state: Dict[str, Any]) -> None:
+    """
+    Writes a state atomically, so an interrupted run keeps the old one.
+    """
+    temporary = state_path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temporary, state_path)
+
+
+def refresh_salary_report(
+        file_path: str,
+        state_path: Optional[str] = None
+        ) -> Dict[str, Dict[str, float]]:
+    """
+    Generates the salary report of an append-only CSV file, reading
+    only the rows appended since the previous call.
+
+    The running statistics of add_value per department and the byte
+    offset processed so far are persisted in state_path. The whole
+    file is read again when the state has an older format, the header
+    changed, the file shrank or the bytes before the saved offset
+    differ.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - state_path (Optional[str]): Where to keep the state, next to the
+    CSV file by default.
+
+    Returns:
+    - Dict[str, Dict[str, float]]: The same report as make_salary_report
+    over the complete rows of the file.
+    """
+    if state_path is None:
+        state_path = state_path_for(file_path)
+    header, start = read_header(file_path)
+    size = complete_size(file_path)
+
+    state = load_state(state_path)
+    if (
+        state is None
+        or state.get('version') != STATE_VERSION
+        or state['header'] != header
+        or state['offset'] > size
+        or state['fingerprint'] != fingerprint(file_path, state['offset'])
+    ):
+        state = {
+            'version': STATE_VERSION,
+            'header': header,
+            'offset': start,
+            'partial': {},
+        }
+
+    partials = [state['partial']]
+    for chunk_start, chunk_stop in chunk_bounds(
+            file_path, state['offset'], size=size
+            ):
+        partials.append(
+            aggregate_range(file_path, chunk_start, chunk_stop, header)
+        )
+    if len(partials) > 1:
+        state['partial'] = merge_partials(partials)
+        state['offset'] = size
+        state['fingerprint'] = fingerprint(file_path, state['offset'])
+        save_state(state_path, state)
+    return finish_stats(state['partial'])
+
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        copy_path = os.path.join(directory, 'Corp_Summary.csv')
+        with open(PATH, 'rb') as file:
+            lines = file.readlines()
+        with open(copy_path, 'wb') as file:
+            file.writelines(lines[:100])
+            file.write(lines[100][:10])
+        expected = make_salary_report(iter_rows(PATH))
+
+        rows = list(iter_rows(PATH))
+        assert refresh_salary_report(copy_path) \
+            == make_salary_report(rows[:99])
+        with open(copy_path, 'ab') as file:
+            file.write(lines[100][10:])
+            file.writelines(lines[101:])
+        assert refresh_salary_report(copy_path) == expected
+        assert refresh_salary_report(copy_path) == expected
+
+        with open(copy_path, 'wb') as file:
+            file.writelines(lines)
+        assert refresh_salary_report(copy_path) == expected
+
+        outputs = []
+        for options in ([], ['--incremental'], ['--incremental']):
+            output_path = os.path.join(directory, 'report.csv')
+            main([copy_path, '-o', output_path] + options)
+            with open(output_path, encoding='utf-8') as file:
+                outputs.append(file.read())
+        assert outputs[0] == outputs[1] == outputs[2]
+    finally:
+        shutil.rmtree(directory)
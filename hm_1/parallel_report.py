@@ -0,0 +1,162 @@
+import csv
+import os
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from parse_csv import (
+    PATH, add_value, finish_stats, iter_rows, make_salary_report, merge_stats
+)
+
+CHUNK_SIZE = 32 * 2**20
+
+Partial = Dict[str, Dict[str, float]]
+
+
+def read_header(file_path: str) -> Tuple[List[str], int]:
+    """
+    Reads the header of a CSV file specified by file_path.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+
+    Returns:
+    - Tuple[List[str], int]: The column names and the byte offset of the
+    first data row.
+    """
+    with open(file_path, 'rb') as file:
+        line = file.readline()
+    header = next(csv.reader([line.decode('utf-8-sig')], delimiter=';'))
+    return header, len(line)
+
+
+def chunk_bounds(
+        file_path: str,
+        start: int,
+        chunk_size: int = CHUNK_SIZE,
+        size: Optional[int] = None
+        ) -> List[Tuple[int, int]]:
+    """
+    Splits a file into byte ranges of about chunk_size bytes, each
+    ending right after a line break.
+
+    Rows must not contain quoted line breaks, which holds for the HR
+    exports.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - start (int): The byte offset of the first range.
+    - chunk_size (int): The approximate size of a range in bytes.
+    - size (Optional[int]): The offset where the last range ends, the
+    end of the file by default.
+
+    Returns:
+    - List[Tuple[int, int]]: The (start, stop) offsets of the ranges.
+    """
+    if size is None:
+        size = os.path.getsize(file_path)
+    bounds = []
+    with open(file_path, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_size, size))
+            file.readline()
+            stop = min(file.tell(), size)
+            bounds.append((start, stop))
+            start = stop
+    return bounds
+
+
+def aggregate_range(
+        file_path: str,
+        start: int,
+        stop: int,
+        header: List[str]
+        ) -> Partial:
+    """
+    Aggregates the salaries in a byte range of a CSV file.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - start (int): The offset of the first row of the range.
+    - stop (int): The offset right after the last row of the range.
+    - header (List[str]): The column names of the file.
+
+    Returns:
+    - Partial: Running statistics of add_value per department.
+    """
+    department_index = header.index('Департамент')
+    salary_index = header.index('Оклад')
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        lines = file.read(stop - start).decode('utf-8').splitlines()
+
+    partial = {}
+    for row in csv.reader(lines, delimiter=';'):
+        if row:
+            add_value(partial, row[department_index], float(row[salary_index]))
+    return partial
+
+
+def _aggregate_range(args: Tuple[str, int, int, List[str]]) -> Partial:
+    return aggregate_range(*args)
+
+
+def merge_partials(partials: Iterable[Partial]) -> Partial:
+    """
+    Merges partial aggregates of several byte ranges with merge_stats.
+
+    Parameters:
+    - partials (Iterable[Partial]): Outputs of aggregate_range.
+
+    Returns:
+    - Partial: Running statistics per department, departments in order
+    of first appearance.
+    """
+    merged = {}
+    for partial in partials:
+        merge_stats(merged, partial)
+    return merged
+
+
+def make_salary_report_parallel(
+        file_path: str,
+        n_jobs: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE
+        ) -> Dict[str, Dict[str, float]]:
+    """
+    Generates the salary report of a CSV file with a process pool.
+
+    The file is split into line-aligned byte ranges that the workers
+    aggregate independently; the partial aggregates are then merged
+    in file order.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - n_jobs (Optional[int]): The number of worker processes, all CPUs
+    by default.
+    - chunk_size (int): The approximate size of a byte range.
+
+    Returns:
+    - Dict[str, Dict[str, float]]: The same report as make_salary_report
+    over the rows of the file.
+    """
+    header, start = read_header(file_path)
+    tasks = [
+        (file_path, chunk_start, chunk_stop, header)
+        for chunk_start, chunk_stop in chunk_bounds(
+            file_path, start, chunk_size
+        )
+    ]
+    if n_jobs == 1 or len(tasks) <= 1:
+        partials = map(_aggregate_range, tasks)
+        return finish_stats(merge_partials(partials))
+    with Pool(n_jobs) as pool:
+        partials = pool.imap(_aggregate_range, tasks)
+        return finish_stats(merge_partials(partials))
+
+
+if __name__ == '__main__':
+    expected = make_salary_report(iter_rows(PATH))
+    assert make_salary_report_parallel(PATH) == expected
+    assert make_salary_report_parallel(PATH, chunk_size=100) == expected
+    assert make_salary_report_parallel(PATH, n_jobs=1, chunk_size=1) \
+        == expected
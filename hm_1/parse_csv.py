@@ -1,5 +1,16 @@
+import argparse
 import csv
-from typing import Any, Dict, List, Set
+import io
+import json
+import os
+import sys
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+)
+
+from quantiles import (
+    QuantileSketch, check_percentiles, percentile_key, percentiles_of
+)
 
 
 PATH = './Corp_Summary.csv'
@@ -18,6 +29,33 @@ SIDE_MENU = """
     Введите номер пункта:
     """
 
+REPORTS = {
+    'salary': ['Department', 'count', 'min', 'max', 'average'],
+    'hierarchy': ['Department', 'Branch'],
+}
+FORMATS = {'csv': '.csv', 'jsonl': '.jsonl', 'text': '.txt'}
+
+_CACHE: Dict[str, Tuple[Tuple[int, int], Tuple[Dict, Dict]]] = {}
+
+
+def iter_rows(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yields the rows of a CSV file specified by file_path.
+
+    Only one row is held in memory at a time, so reports built from
+    this generator need memory proportional to the number of
+    departments, not to the number of employees.
+
+    Parameters:
+    - file_path (str): The path to the CSV file to be read.
+
+    Yields:
+    - Dict[str, Any]: A dictionary per row of the CSV file, with keys
+    being the column headers and values being the row entries.
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        yield from csv.DictReader(file, delimiter=';')
+
 
 def read_file(file_path: str) -> List[Dict[str, Any]]:
     """
@@ -31,39 +69,32 @@ def read_file(file_path: str) -> List[Dict[str, Any]]:
     dictionary represents a row in the CSV file, with keys being
     the column headers and values being the row entries.
     """
-    data = []
-
-    with open(file_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file, delimiter=';')
-        for row in reader:
-            data.append(row)
-
-    return data
+    return list(iter_rows(file_path))
 
 
-def make_hierarchy(data: List[Dict[str, Any]]) -> Dict[str, Set[str]]:
+def make_hierarchy(data: Iterable[Dict[str, Any]]) -> Dict[str, Set[str]]:
     """
-    Constructs a hierarchy mapping from a list
-    of data where each element is a dictionary
-    containing department and branch information.
+    Constructs a hierarchy mapping in a single pass over data where
+    each element is a dictionary containing department and branch
+    information.
 
     Parameters:
-    - data (List[Dict[str, Any]]): A list of dictionaries where
-    each dictionary contains department and branch data with keys
-    'Департамент' and 'Отдел'.
+    - data (Iterable[Dict[str, Any]]): A list or a row generator such
+    as iter_rows, where each dictionary contains department and branch
+    data with keys 'Департамент' and 'Отдел'.
 
     Returns:
     - Dict[str, Set[str]]: A dictionary where keys are department names
     and values are sets of branches within those departments.
     """
-    departments = set([el['Департамент'] for el in data])
-    hierarchy = {dept: set() for dept in departments}
+    hierarchy = {}
 
     for el in data:
         branch = el['Отдел']
         department = el['Департамент']
+        branches = hierarchy.setdefault(department, set())
         if branch not in department:
-            hierarchy[department].add(branch)
+            branches.add(branch)
     return hierarchy
 
 
@@ -85,49 +116,183 @@ def print_hierarchy(hierarchy: Dict[str, Set[str]]) -> None:
 
 
 def make_salary_report(
-        data: List[Dict[str, Any]]
+        data: Iterable[Dict[str, Any]],
+        percentiles: Sequence[float] = (),
+        exact: bool = True
         ) -> Dict[str, Dict[str, float]]:
     """
-    Generates a salary report from a list of dictionaries containing
-    salary data.
+    Generates a salary report in a single pass over dictionaries
+    containing salary data.
 
     Parameters:
-    - data (List[Dict[str, Any]]): A list of dictionaries, where each
-    dictionary contains salary information for an employee
-    with keys 'Департамент' and 'Оклад'.
+    - data (Iterable[Dict[str, Any]]): A list or a row generator such
+    as iter_rows, where each dictionary contains salary information
+    for an employee with keys 'Департамент' and 'Оклад'.
+    - percentiles (Sequence[float]): Salary percentiles from 0 to 100
+    to add to the report, e.g. (50, 90, 99).
+    - exact (bool): Keep every salary and sort them per department, or
+    estimate the percentiles with a QuantileSketch in bounded memory.
 
     Returns:
     - Dict[str, Dict[str, float]]: A dictionary where the key is a department
     and the value is another dictionary containing 'count', 'min', 'max',
-    and 'average' salary data.
+    and 'average' salary data, plus a 'p50'-like key per percentile,
+    rounded like the average.
+
+    Raises:
+    - ValueError: If a percentile is not between 0 and 100.
     """
-    report = {}
+    check_percentiles(percentiles)
+    stats = {}
+    samples = {}
     for el in data:
         department = el['Департамент']
         salary = float(el['Оклад'])
+        add_value(stats, department, salary)
+        if percentiles:
+            if department not in samples:
+                samples[department] = [] if exact else QuantileSketch()
+            sample = samples[department]
+            if exact:
+                sample.append(salary)
+            else:
+                sample.add(salary)
+
+    report = finish_stats(stats)
+    for department, sample in samples.items():
+        for key, value in percentiles_of(sample, percentiles).items():
+            report[department][key] = round(value, 0)
+    return report
 
-        if department not in report:
-            report[department] = {
-                'count': 0,
-                'min': float('inf'),
-                'max': -float('inf'),
-                'total': 0,
-            }
-
-        report[department]['count'] += 1
-        if salary < report[department]['min']:
-            report[department]['min'] = salary
-        if salary > report[department]['max']:
-            report[department]['max'] = salary
-        report[department]['total'] += salary
-
-    for dept, _ in report.items():
-        report[dept]['average'] = round(
-            report[dept]['total'] / report[dept]['count'], 0
-        )
-        del report[dept]['total']
 
-    return report
+def add_value(
+        stats: Dict[Any, Dict[str, float]],
+        key: Any,
+        value: float
+        ) -> None:
+    """
+    Folds one value into the running statistics of a key.
+
+    This is the accumulator of every salary report, whether serial,
+    parallel, incremental or columnar, and of group_by.
+
+    Parameters:
+    - stats (Dict[Any, Dict[str, float]]): Running 'count', 'min',
+    'max' and 'total' per key, updated in place.
+    - key (Any): The key of the value, e.g. a department.
+    - value (float): The value, e.g. a salary.
+    """
+    entry = stats.get(key)
+    if entry is None:
+        stats[key] = {'count': 1, 'min': value, 'max': value, 'total': value}
+        return
+    entry['count'] += 1
+    if value < entry['min']:
+        entry['min'] = value
+    if value > entry['max']:
+        entry['max'] = value
+    entry['total'] += value
+
+
+def merge_stats(
+        stats: Dict[Any, Dict[str, float]],
+        other: Dict[Any, Dict[str, float]]
+        ) -> None:
+    """
+    Folds the running statistics of another part of the data into
+    stats, as if its values had been added with add_value.
+
+    Parameters:
+    - stats (Dict[Any, Dict[str, float]]): Running statistics, updated
+    in place; new keys are appended in the order of other.
+    - other (Dict[Any, Dict[str, float]]): Running statistics of the
+    values that follow.
+    """
+    for key, part in other.items():
+        entry = stats.get(key)
+        if entry is None:
+            stats[key] = dict(part)
+            continue
+        entry['count'] += part['count']
+        entry['min'] = min(entry['min'], part['min'])
+        entry['max'] = max(entry['max'], part['max'])
+        entry['total'] += part['total']
+
+
+def finish_stats(
+        stats: Dict[Any, Dict[str, float]]
+        ) -> Dict[Any, Dict[str, float]]:
+    """
+    Turns running statistics into a salary report with rounded averages.
+
+    Parameters:
+    - stats (Dict[Any, Dict[str, float]]): Running statistics built by
+    add_value and merge_stats, left unchanged.
+
+    Returns:
+    - Dict[Any, Dict[str, float]]: 'count', 'min', 'max' and 'average'
+    per key.
+    """
+    return {
+        key: {
+            'count': entry['count'],
+            'min': entry['min'],
+            'max': entry['max'],
+            'average': round(entry['total'] / entry['count'], 0),
+        }
+        for key, entry in stats.items()
+    }
+
+
+def aggregate(
+        data: Iterable[Dict[str, Any]]
+        ) -> Tuple[Dict[str, Set[str]], Dict[str, Dict[str, float]]]:
+    """
+    Builds the hierarchy and the salary report in a single pass.
+
+    Parameters:
+    - data (Iterable[Dict[str, Any]]): A list or a row generator such
+    as iter_rows with keys 'Департамент', 'Отдел' and 'Оклад'.
+
+    Returns:
+    - Tuple[Dict[str, Set[str]], Dict[str, Dict[str, float]]]: The
+    results of make_hierarchy and make_salary_report for data.
+    """
+    hierarchy = {}
+    stats = {}
+    for el in data:
+        branch = el['Отдел']
+        department = el['Департамент']
+        branches = hierarchy.setdefault(department, set())
+        if branch not in department:
+            branches.add(branch)
+        add_value(stats, department, float(el['Оклад']))
+    return hierarchy, finish_stats(stats)
+
+
+def load_aggregates(
+        file_path: str
+        ) -> Tuple[Dict[str, Set[str]], Dict[str, Dict[str, float]]]:
+    """
+    Returns the hierarchy and the salary report of a CSV file, reading
+    the file only when its size or modification time has changed since
+    the last call.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+
+    Returns:
+    - Tuple[Dict[str, Set[str]], Dict[str, Dict[str, float]]]: The
+    hierarchy and the salary report. They are shared with the cache and
+    must not be modified.
+    """
+    stat = os.stat(file_path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _CACHE.get(file_path)
+    if cached is None or cached[0] != key:
+        cached = key, aggregate(iter_rows(file_path))
+        _CACHE[file_path] = cached
+    return cached[1]
 
 
 def print_salary_report(report: Dict[str, Dict[str, float]]) -> None:
@@ -165,10 +330,9 @@ def save_salary_report(report: Dict[str, Dict[str, float]]) -> None:
     - A file 'report.csv' is created or overwritten in the current working
     directory with the salary report data.
     """
-    for k, v in report.items():
-        v.update({'Department': k})
-
-    final_report = list(report.values())
+    final_report = [
+        {'Department': k, **v} for k, v in report.items()
+    ]
     header = ['Department', 'count', 'min', 'max', 'average']
     name_file = 'report.csv'
     with open(f'{name_file}', 'w') as csvfile:
@@ -178,19 +342,223 @@ def save_salary_report(report: Dict[str, Dict[str, float]]) -> None:
     print(f'\nОтчёт сохранён: {name_file}')
 
 
-if __name__ == '__main__':
-    data = read_file(PATH)
+def report_rows(
+        file_path: str,
+        kind: str,
+        percentiles: Sequence[float] = (),
+        exact: bool = True,
+        incremental: bool = False
+        ) -> List[Dict[str, Any]]:
+    """
+    Builds a report of a CSV file as flat rows, streaming the file.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - kind (str): 'salary' or 'hierarchy'.
+    - percentiles (Sequence[float]): Percentiles of the salary report.
+    - exact (bool): Exact or estimated percentiles.
+    - incremental (bool): Build the salary report with
+    incremental_report.refresh_salary_report, reading only the rows
+    appended since the previous run; percentiles are not supported.
+
+    Returns:
+    - List[Dict[str, Any]]: Rows with the columns of REPORTS[kind] and
+    the percentiles.
+    """
+    if kind == 'salary' and incremental:
+        from incremental_report import refresh_salary_report
+
+        report = refresh_salary_report(file_path)
+        return [{'Department': k, **v} for k, v in report.items()]
+    if kind == 'salary':
+        report = make_salary_report(
+            iter_rows(file_path), percentiles, exact
+        )
+        return [{'Department': k, **v} for k, v in report.items()]
+    hierarchy = make_hierarchy(iter_rows(file_path))
+    return [
+        {'Department': department, 'Branch': branch}
+        for department, branches in hierarchy.items()
+        for branch in sorted(branches)
+    ]
+
+
+def format_rows(
+        rows: List[Dict[str, Any]],
+        header: List[str],
+        output_format: str
+        ) -> str:
+    """
+    Renders report rows as CSV, JSON Lines or an aligned text table.
+
+    Parameters:
+    - rows (List[Dict[str, Any]]): The report rows.
+    - header (List[str]): The columns of the rows.
+    - output_format (str): 'csv', 'jsonl' or 'text'.
+
+    Returns:
+    - str: The whole rendered report, to be written in one call.
+    """
+    if output_format == 'jsonl':
+        return ''.join(
+            json.dumps(row, ensure_ascii=False) + '\n' for row in rows
+        )
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    table = [header] + [[str(row[key]) for key in header] for row in rows]
+    widths = [max(map(len, column)) for column in zip(*table)]
+    lines = [
+        ' | '.join(
+            value.ljust(width) if isinstance(rows[0][key], str)
+            else value.rjust(width)
+            for value, width, key in zip(line, widths, header)
+        ).rstrip()
+        for line in table
+    ] if rows else [' | '.join(header)]
+    lines.insert(1, '-+-'.join('-' * width for width in widths))
+    return '\n'.join(lines) + '\n'
+
+
+def write_report(
+        file_path: str,
+        output_path: str,
+        kind: str = 'salary',
+        output_format: str = 'csv',
+        percentiles: Sequence[float] = (),
+        exact: bool = True,
+        incremental: bool = False
+        ) -> None:
+    """
+    Writes a report of a CSV file to output_path, '-' for stdout.
+
+    Parameters:
+    - file_path (str): The path to the CSV file.
+    - output_path (str): The path of the report file or '-'.
+    - kind (str): 'salary' or 'hierarchy'.
+    - output_format (str): 'csv', 'jsonl' or 'text'.
+    - percentiles (Sequence[float]): Percentiles of the salary report.
+    - exact (bool): Exact or estimated percentiles.
+    - incremental (bool): Reuse the saved state of the salary report.
+    """
+    header = REPORTS[kind]
+    if kind == 'salary':
+        header = header + [percentile_key(p) for p in percentiles]
+    text = format_rows(
+        report_rows(file_path, kind, percentiles, exact, incremental),
+        header,
+        output_format
+    )
+    if output_path == '-':
+        sys.stdout.write(text)
+        return
+    with open(output_path, 'w', encoding='utf-8', newline='') as file:
+        file.write(text)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Writes reports of CSV files without user interaction.
+
+    With one input the report goes to --output (stdout by default);
+    with several inputs --output is a directory receiving a report per
+    input named after it. Inputs that would share a report name are
+    rejected before anything is written. With --incremental the salary
+    report of an append-only input only reads the rows added since the
+    previous run, whose state is kept in '<input>.state.json'.
+
+    Parameters:
+    - argv (Optional[List[str]]): Command line arguments, sys.argv by
+    default.
+    """
+    parser = argparse.ArgumentParser(
+        description='Build department reports from HR CSV exports.'
+    )
+    parser.add_argument('inputs', nargs='+', help='CSV files to report on')
+    parser.add_argument(
+        '-o', '--output', default='-',
+        help='report file, or a directory for several inputs; '
+             'stdout by default'
+    )
+    parser.add_argument(
+        '-r', '--report', choices=list(REPORTS), default='salary'
+    )
+    parser.add_argument(
+        '-f', '--format', choices=list(FORMATS), default='csv'
+    )
+    parser.add_argument(
+        '-p', '--percentiles', type=float, nargs='+', default=[],
+        metavar='P', help='salary percentiles to add, e.g. 50 90 99'
+    )
+    parser.add_argument(
+        '--approximate', action='store_true',
+        help='estimate percentiles in bounded memory'
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='read only the rows appended since the previous salary '
+             'report, keeping its state next to each input'
+    )
+    args = parser.parse_args(argv)
+    try:
+        check_percentiles(args.percentiles)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.incremental and args.report != 'salary':
+        parser.error('--incremental only applies to the salary report')
+    if args.incremental and args.percentiles:
+        parser.error('--incremental cannot be combined with --percentiles')
+    options = {
+        'percentiles': args.percentiles,
+        'exact': not args.approximate,
+        'incremental': args.incremental,
+    }
+
+    if len(args.inputs) == 1:
+        write_report(
+            args.inputs[0], args.output, args.report, args.format, **options
+        )
+        return
+    if args.output == '-':
+        parser.error('--output must be a directory for several inputs')
+    outputs = {}
+    for file_path in args.inputs:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        output_path = os.path.join(
+            args.output, f'{stem}.{args.report}{FORMATS[args.format]}'
+        )
+        if output_path in outputs:
+            parser.error(
+                f'{outputs[output_path]} and {file_path} would both be '
+                f'written to {output_path}'
+            )
+        outputs[output_path] = file_path
+    os.makedirs(args.output, exist_ok=True)
+    for output_path, file_path in outputs.items():
+        write_report(
+            file_path, output_path, args.report, args.format, **options
+        )
+
+
+def run_menu() -> None:
+    """
+    Runs the interactive menu over the file at PATH.
+    """
     while True:
         print(MAIN_MENU)
 
         choice = input()
 
         if choice == '1':
-            hierarchy = make_hierarchy(data)
+            hierarchy, _ = load_aggregates(PATH)
             print_hierarchy(hierarchy)
 
         elif choice == '2':
-            report = make_salary_report(data)
+            _, report = load_aggregates(PATH)
             print_salary_report(report)
             while True:
                 print(SIDE_MENU)
@@ -211,7 +579,7 @@ if __name__ == '__main__':
                         """)
 
         elif choice == '3':
-            report = make_salary_report(data)
+            _, report = load_aggregates(PATH)
             save_salary_report(report)
 
         elif choice == '4':
@@ -220,3 +588,10 @@ if __name__ == '__main__':
 
         else:
             print('\nНеверный ввод! Пожалуйста, введите номер от 1 до 4.')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main()
+    else:
+        run_menu()
@@ -0,0 +1,215 @@
+import math
+from typing import Dict, Iterable, List, Sequence, Union
+
+RELATIVE_ACCURACY = 0.01
+
+
+def exact_percentile(values: Sequence[float], percentile: float) -> float:
+    """
+    Computes a percentile of sorted values with linear interpolation
+    between the closest ranks, as numpy.percentile does by default.
+
+    Parameters:
+    - values (Sequence[float]): Sorted, non-empty values.
+    - percentile (float): The percentile, from 0 to 100.
+
+    Returns:
+    - float: The percentile of values.
+    """
+    rank = percentile / 100 * (len(values) - 1)
+    low = math.floor(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming sketch of a distribution with bounded memory.
+
+    Values are counted in logarithmic buckets, as in DDSketch: bucket i
+    holds the values in (gamma ** (i - 1), gamma ** i], so any estimated
+    percentile is within relative_accuracy of a value of the stream of
+    that rank. Memory grows with log(max / min) instead of with the
+    number of values, and two sketches merge by adding their counts,
+    which lets shards of a file be sketched independently.
+
+    Attributes:
+    - relative_accuracy (float): The guaranteed relative error.
+    - count (int): The number of values added.
+    - min (float): The smallest value added.
+    - max (float): The largest value added.
+    """
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy must be between 0 and 1')
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.min = float('inf')
+        self.max = -float('inf')
+        self._positive = {}
+        self._negative = {}
+        self._zeros = 0
+
+    def _bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, bucket: int) -> float:
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def add(self, value: float) -> None:
+        """
+        Adds a value to the sketch.
+        """
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value > 0:
+            bucket = self._bucket(value)
+            self._positive[bucket] = self._positive.get(bucket, 0) + 1
+        elif value < 0:
+            bucket = self._bucket(-value)
+            self._negative[bucket] = self._negative.get(bucket, 0) + 1
+        else:
+            self._zeros += 1
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        Adds the values of another sketch with the same accuracy.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError('cannot merge sketches of different accuracy')
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._zeros += other._zeros
+        for buckets, others in (
+                (self._positive, other._positive),
+                (self._negative, other._negative)
+                ):
+            for bucket, count in others.items():
+                buckets[bucket] = buckets.get(bucket, 0) + count
+
+    def __len__(self) -> int:
+        """
+        Returns the number of buckets, which bounds the memory used.
+        """
+        return len(self._positive) + len(self._negative) + bool(self._zeros)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimates a percentile of the values added.
+
+        Parameters:
+        - percentile (float): The percentile, from 0 to 100.
+
+        Returns:
+        - float: The estimate, within relative_accuracy of the value of
+        the closest rank.
+        """
+        if not self.count:
+            raise ValueError('percentile of an empty sketch')
+        rank = round(percentile / 100 * (self.count - 1))
+        seen = 0
+        for bucket in sorted(self._negative, reverse=True):
+            seen += self._negative[bucket]
+            if seen > rank:
+                return max(-self._value(bucket), self.min)
+        seen += self._zeros
+        if seen > rank:
+            return 0.0
+        for bucket in sorted(self._positive):
+            seen += self._positive[bucket]
+            if seen > rank:
+                return min(self._value(bucket), self.max)
+        return self.max
+
+
+def check_percentiles(percentiles: Iterable[float]) -> None:
+    """
+    Checks that every percentile is between 0 and 100.
+
+    Parameters:
+    - percentiles (Iterable[float]): The percentiles to check.
+
+    Raises:
+    - ValueError: If a percentile is out of range.
+    """
+    for percentile in percentiles:
+        if not 0 <= percentile <= 100:
+            raise ValueError(
+                f'percentile must be between 0 and 100, got {percentile:g}'
+            )
+
+
+def percentile_key(percentile: float) -> str:
+    """
+    Returns the report column of a percentile, e.g. 'p90'.
+    """
+    return f'p{percentile:g}'
+
+
+def percentiles_of(
+        sample: Union[List[float], QuantileSketch],
+        percentiles: Iterable[float]
+        ) -> Dict[str, float]:
+    """
+    Computes percentiles of a list of values or of a sketch.
+
+    Parameters:
+    - sample (Union[List[float], QuantileSketch]): Values, sorted in
+    place for the exact percentiles, or a sketch for estimates.
+    - percentiles (Iterable[float]): Percentiles from 0 to 100.
+
+    Returns:
+    - Dict[str, float]: The percentiles keyed by percentile_key.
+    """
+    if isinstance(sample, QuantileSketch):
+        return {
+            percentile_key(percentile): sample.percentile(percentile)
+            for percentile in percentiles
+        }
+    sample.sort()
+    return {
+        percentile_key(percentile): exact_percentile(sample, percentile)
+        for percentile in percentiles
+    }
+
+
+if __name__ == '__main__':
+    import random
+
+    rng = random.Random(0)
+    values = [rng.lognormvariate(11, 0.4) for _ in range(100000)]
+    ordered = sorted(values)
+
+    whole = QuantileSketch()
+    shards = [QuantileSketch() for _ in range(4)]
+    for index, value in enumerate(values):
+        whole.add(value)
+        shards[index % 4].add(value)
+    merged = QuantileSketch()
+    for shard in shards:
+        merged.merge(shard)
+
+    for percentile in (0, 1, 50, 90, 99, 100):
+        exact = ordered[round(percentile / 100 * (len(ordered) - 1))]
+        estimate = whole.percentile(percentile)
+        assert abs(estimate - exact) <= whole.relative_accuracy * exact
+        assert merged.percentile(percentile) == estimate
+
+    assert exact_percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentiles_of([3.0, 1.0, 2.0], [0, 50, 100]) \
+        == {'p0': 1.0, 'p50': 2.0, 'p100': 3.0}
+    assert len(whole) < 200
+
+    try:
+        check_percentiles([50, 150])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('150 is not a percentile')
@@ -1,64 +1,159 @@
-from typing import Dict, List
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
 
 import warnings
 
 
+class CSRMatrix:
+    """
+    Compressed sparse row (CSR) matrix.
+
+    Non-zero values of row ``i`` are stored in
+    ``data[indptr[i]:indptr[i + 1]]`` and their column numbers in
+    ``indices[indptr[i]:indptr[i + 1]]``.
+    """
+    def __init__(
+            self,
+            indptr: Sequence[int],
+            indices: Sequence[int],
+            data: Sequence[int],
+            shape: Tuple[int, int]
+            ) -> None:
+        """
+        Initialize the CSRMatrix instance.
+
+        Args:
+            indptr: Row boundaries, ``len(indptr) == n_rows + 1``.
+            indices: Column number of every non-zero value.
+            data: Non-zero values.
+            shape: Number of rows and columns.
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @property
+    def nnz(self) -> int:
+        """
+        Number of stored (non-zero) values.
+        """
+        return len(self.data)
+
+    def toarray(self) -> List[List[int]]:
+        """
+        Convert the matrix to a dense list of lists.
+
+        Returns:
+            The dense matrix.
+        """
+        n_rows, n_cols = self.shape
+        output = []
+        for i in range(n_rows):
+            row = [0] * n_cols
+            for j in range(self.indptr[i], self.indptr[i + 1]):
+                row[self.indices[j]] = self.data[j]
+            output.append(row)
+        return output
+
+
 class CountVectorizer:
     """
     Convert a collection of text documents to a matrix of token counts.
     """
-    def __init__(self) -> None:
+    def __init__(self, sparse: bool = False) -> None:
         """
         Initialize the CountVectorizer instance.
 
-        Sets up empty lists for tokenized corpus, individual texts,
-        and feature names.
+        Args:
+            sparse: Return a CSRMatrix instead of a dense list of lists
+                from fit_transform.
         """
-        self.tokenized_corpus = []
-        self.tokenized_text = []
+        self.sparse = sparse
         self.feature_names = []
+        self.vocabulary: Dict[str, int] = {}
+        self.dict_counter: Dict[str, int] = {}
 
-    def _tokenize(self, corpus: List[str]) -> None:
+    def _count_tokens(self, text: str) -> Dict[str, int]:
         """
-        Tokenize the given corpus.
+        Tokenize a document and count its tokens.
 
         Args:
-            corpus: A list of text documents.
+            text: A text document.
+
+        Returns:
+            A dictionary of token counts in order of first occurrence.
         """
-        for text in corpus:
-            tokens = text.lower().split()
-            self.tokenized_text.append(tokens)
-            self.tokenized_corpus.extend(tokens)
+        counts: Dict[str, int] = {}
+        for token in text.lower().split():
+            counts[token] = counts.get(token, 0) + 1
+        return counts
 
     def _set_feature_names(self) -> None:
         """
-        Create a dictionary counter and set the feature names for the corpus.
+        Build the token to column index and set the feature names.
         """
-        self.dict_counter: Dict[str, int] = {}
-        for el in self.tokenized_corpus:
-            self.dict_counter[el] = self.dict_counter.get(el, 0) + 1
-        self.feature_names = list(self.dict_counter.keys())
+        self.vocabulary = {
+            token: i for i, token in enumerate(self.dict_counter)
+        }
+        self.feature_names = list(self.vocabulary)
+
+    def _rows_to_csr(self, rows: Iterable[Dict[str, int]]) -> CSRMatrix:
+        """
+        Map per-document token counts to a CSRMatrix.
 
-    def fit_transform(self, corpus: List[str]) -> List[List[int]]:
+        Args:
+            rows: Token counts of every document.
+
+        Returns:
+            The document-term matrix in CSR form.
+        """
+        indptr = array('q', [0])
+        indices = array('q')
+        data = array('q')
+        for counts in rows:
+            row = sorted(
+                (self.vocabulary[token], count)
+                for token, count in counts.items()
+                if token in self.vocabulary
+            )
+            for column, count in row:
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        shape = (len(indptr) - 1, len(self.vocabulary))
+        return CSRMatrix(indptr, indices, data, shape)
+
+    def fit_transform(
+            self,
+            corpus: List[str]
+            ) -> Union[List[List[int]], CSRMatrix]:
         """
         Learn the vocabulary dictionary and return document-term matrix.
 
+        Every document is tokenized and counted in a single pass, so the
+        cost follows the number of non-zero entries.
+
         Args:
             corpus: A list of text documents.
 
         Returns:
-            The document-term matrix.
+            The document-term matrix, a CSRMatrix if ``sparse`` is set.
         """
-        self._tokenize(corpus)
+        self.dict_counter = {}
+        rows = []
+        for text in corpus:
+            counts = self._count_tokens(text)
+            for token, count in counts.items():
+                self.dict_counter[token] = (
+                    self.dict_counter.get(token, 0) + count
+                )
+            rows.append(counts)
         self._set_feature_names()
-        output = []
-        for i in range(len(corpus)):
-            tmp = []
-            tokenized_text = self.tokenized_text[i]
-            for token in self.feature_names:
-                tmp.append(tokenized_text.count(token))
-            output.append(tmp)
-        return output
+        matrix = self._rows_to_csr(rows)
+        if self.sparse:
+            return matrix
+        return matrix.toarray()
 
     def get_feature_names(self) -> List[str]:
         """
@@ -95,5 +190,9 @@ if __name__ == '__main__':
     assert names == check_feature_names
     assert count_matrix == check_count_matrix
 
+    sparse_matrix = CountVectorizer(sparse=True).fit_transform(corpus)
+    assert list(sparse_matrix.indptr) == [0, 6, 13]
+    assert sparse_matrix.toarray() == check_count_matrix
+
     print(f'count matrix : {count_matrix}')
     print(f'feature names: {names}')